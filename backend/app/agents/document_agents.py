@@ -4,6 +4,7 @@ AI Agents for Document Processing Workflow
 from crewai import Agent, Task, Crew
 from langchain_groq import ChatGroq
 from app.core.config import settings
+from app.agents.llm import invoke_llm, kickoff_crew
 from typing import Dict, Any
 
 
@@ -182,7 +183,7 @@ class DocumentProcessingCrew:
             )
             
             # Execute the crew workflow
-            result = crew.kickoff()
+            result = kickoff_crew(crew, self.llm, "DocumentProcessingCrew")
             
             # Parse and structure the results
             return {
@@ -237,7 +238,7 @@ Be specific and actionable in your response."""
             from langchain_core.messages import HumanMessage
             
             messages = [HumanMessage(content=prompt)]
-            response = self.llm.invoke(messages)
+            response = invoke_llm(self.llm, messages, "QuickDocumentProcessor")
             
             return {
                 "status": "completed",
@@ -1,10 +1,13 @@
 """
 AI Agents for Lead Qualification Workflow
 """
+import json
+import re
 from crewai import Agent, Task, Crew
 from langchain_groq import ChatGroq
 from app.core.config import settings
-from typing import Dict, Any
+from app.agents.llm import invoke_llm, kickoff_crew
+from typing import Any, Dict, List, Optional
 
 
 class LeadQualificationCrew:
@@ -170,7 +173,7 @@ class LeadQualificationCrew:
             )
             
             # Execute the crew workflow
-            result = crew.kickoff()
+            result = kickoff_crew(crew, self.llm, "LeadQualificationCrew")
             
             # Parse and structure the results
             return {
@@ -222,7 +225,7 @@ Analyze this lead and provide:
 4. Recommended next action for sales team
 5. Priority level (urgent/high/medium/low)
 
-Be specific and actionable in your response."""
+Start with a line "Lead Score: <0-100>". Be specific and actionable in your response."""
         
         try:
             from langchain_core.messages import HumanMessage
@@ -231,11 +234,12 @@ Be specific and actionable in your response."""
             messages = [HumanMessage(content=prompt)]
             
             # Call the LLM
-            response = self.llm.invoke(messages)
+            response = invoke_llm(self.llm, messages, "QuickLeadScorer")
             
             return {
                 "status": "completed",
                 "lead_data": lead_data,
+                "lead_score": _lead_score(response.content),
                 "assessment": response.content,
                 "ai_model": "Llama 3.3 70B (via Groq)"
             }
@@ -246,4 +250,88 @@ Be specific and actionable in your response."""
                 "error": str(e),
                 "traceback": traceback.format_exc()
             }
+    
+    def score_leads(self, leads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score several leads with one LLM call
+        
+        Used by micro-batching. Falls back to one score_lead call per lead
+        when the response is not a JSON array with one assessment per lead.
+        """
+        if len(leads) == 1:
+            return [self.score_lead(leads[0])]
+        
+        sections = "\n\n".join(
+            f"""Lead {index}:
+Name: {lead.get('name', 'N/A')}
+Email: {lead.get('email', 'N/A')}
+Company: {lead.get('company', 'N/A')}
+Phone: {lead.get('phone', 'N/A')}
+Message: {lead.get('message', 'N/A')}"""
+            for index, lead in enumerate(leads, start=1)
+        )
+        prompt = f"""You are a lead qualification expert. Analyze each of these {len(leads)} leads and provide a structured assessment.
+
+{sections}
+
+For each lead provide:
+1. A lead score from 0-100
+2. Qualification level (High/Medium/Low)
+3. Brief reasoning for your assessment
+4. Recommended next action for sales team
+5. Priority level (urgent/high/medium/low)
+
+Start each assessment with a line "Lead Score: <0-100>". Be specific and actionable. Respond with only a JSON array of {len(leads)} strings, one complete assessment per lead, in the order given."""
+        
+        try:
+            from langchain_core.messages import HumanMessage
+            
+            response = invoke_llm(self.llm, [HumanMessage(content=prompt)], "QuickLeadScorer")
+            assessments = _json_array(response.content)
+        except Exception as e:
+            import traceback
+            return [
+                {"status": "failed", "error": str(e), "traceback": traceback.format_exc()}
+                for _ in leads
+            ]
+        
+        if assessments is None or len(assessments) != len(leads):
+            return [self.score_lead(lead) for lead in leads]
+        
+        results = []
+        for lead, assessment in zip(leads, assessments):
+            text = assessment if isinstance(assessment, str) else json.dumps(assessment)
+            results.append({
+                "status": "completed",
+                "lead_data": lead,
+                "lead_score": _lead_score(text),
+                "assessment": text,
+                "ai_model": "Llama 3.3 70B (via Groq)"
+            })
+        return results
+
+
+_LEAD_SCORE = re.compile(r"lead\s*score\W{0,5}(\d{1,3})", re.IGNORECASE)
+
+
+def _lead_score(assessment: str) -> Optional[int]:
+    """
+    Numeric score from the "Lead Score: N" line of an assessment, stored
+    as output_data.lead_score for filters and the lead score index
+    """
+    match = _LEAD_SCORE.search(assessment or "")
+    if match is None or int(match.group(1)) > 100:
+        return None
+    return int(match.group(1))
+
 
+def _json_array(content: str) -> Optional[List[Any]]:
+    """Parse a JSON array from an LLM response, allowing a surrounding code fence"""
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, list) else None
@@ -0,0 +1,238 @@
+"""
+LLM Call Instrumentation
+Single entry point for LLM and crew calls so latency, tokens and errors are recorded
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.deadlines import check_deadline
+from app.core.events import report_progress
+from app.core.metrics import LLM_ERRORS, LLM_REQUEST_DURATION, LLM_TOKENS
+from app.core.tracing import record_span, tracer
+
+
+# Calls collected by the innermost active track_llm_usage() block
+_usage_log: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("llm_usage_log", default=None)
+
+
+@contextmanager
+def track_llm_usage():
+    """
+    Collect token usage and latency of every LLM call made inside the block
+
+    Yields:
+        List that receives one dict per call (processor, model, tokens,
+        latency_ms, cost_usd, status)
+    """
+    calls: List[Dict[str, Any]] = []
+    token = _usage_log.set(calls)
+    try:
+        yield calls
+    finally:
+        _usage_log.reset(token)
+
+
+def llm_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a call according to LLM_PRICING (0 for unpriced models)"""
+    input_price, output_price = settings.LLM_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+EMPTY_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+
+def model_name(llm: Any) -> str:
+    """Model identifier of a LangChain chat model"""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or "unknown"
+
+
+def token_usage(response: Any) -> Dict[str, int]:
+    """
+    Extract prompt/completion token counts from a chat model response
+
+    Prefers LangChain's normalized usage_metadata and falls back to the
+    provider's raw token_usage block (Groq, OpenAI).
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        prompt_tokens = usage.get("input_tokens", 0)
+        completion_tokens = usage.get("output_tokens", 0)
+    else:
+        raw = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        prompt_tokens = raw.get("prompt_tokens", 0)
+        completion_tokens = raw.get("completion_tokens", 0)
+
+    return {
+        "prompt_tokens": prompt_tokens or 0,
+        "completion_tokens": completion_tokens or 0,
+        "total_tokens": (prompt_tokens or 0) + (completion_tokens or 0),
+    }
+
+
+def _log_call(model: str, processor: str, elapsed: float, usage: Dict[str, int], status: str):
+    """Append a call to the active usage log, if any, and report it as progress"""
+    report_progress(
+        "llm_call",
+        processor=processor,
+        model=model,
+        status=status,
+        total_tokens=usage["total_tokens"],
+        latency_ms=round(elapsed * 1000, 3)
+    )
+    calls = _usage_log.get()
+    if calls is None:
+        return
+    calls.append({
+        "processor": processor,
+        "model": model,
+        "status": status,
+        "latency_ms": round(elapsed * 1000, 3),
+        "cost_usd": llm_cost(model, usage["prompt_tokens"], usage["completion_tokens"]),
+        **usage,
+    })
+
+
+def share_llm_calls(calls: List[Dict[str, Any]], count: int) -> List[List[Dict[str, Any]]]:
+    """
+    Split the usage of calls made for a batch evenly between its `count`
+    members, giving any leftover tokens to the first ones
+
+    Returns:
+        One list of calls per member, with that member's share of the
+        tokens and cost and the full latency
+    """
+    shares: List[List[Dict[str, Any]]] = [[] for _ in range(count)]
+    for call in calls:
+        for index, share in enumerate(shares):
+            split = {
+                kind: call[kind] // count + (1 if index < call[kind] % count else 0)
+                for kind in ("prompt_tokens", "completion_tokens")
+            }
+            share.append({
+                **call,
+                **split,
+                "total_tokens": split["prompt_tokens"] + split["completion_tokens"],
+                "cost_usd": call["cost_usd"] / count,
+            })
+    return shares
+
+
+def _record(span: Any, model: str, processor: str, elapsed: float, usage: Dict[str, int]):
+    """Record latency and token counters for a finished call"""
+    LLM_REQUEST_DURATION.labels(model, processor).observe(elapsed)
+    LLM_TOKENS.labels(model, processor, "prompt").inc(usage["prompt_tokens"])
+    LLM_TOKENS.labels(model, processor, "completion").inc(usage["completion_tokens"])
+    span.set_attribute("llm.prompt_tokens", usage["prompt_tokens"])
+    span.set_attribute("llm.completion_tokens", usage["completion_tokens"])
+    _log_call(model, processor, elapsed, usage, "completed")
+
+
+def _record_error(model: str, processor: str, elapsed: float):
+    """Record a failed call"""
+    LLM_ERRORS.labels(model, processor).inc()
+    LLM_REQUEST_DURATION.labels(model, processor).observe(elapsed)
+    _log_call(model, processor, elapsed, EMPTY_USAGE, "failed")
+
+
+def invoke_llm(llm: Any, messages: List[Any], processor: str) -> Any:
+    """
+    Invoke a chat model and record latency, token usage and errors
+
+    Args:
+        llm: LangChain chat model
+        messages: Messages to send
+        processor: Name of the calling processor class
+
+    Returns:
+        The model response
+    """
+    model = model_name(llm)
+    with tracer.start_as_current_span(
+        "llm.invoke",
+        attributes={"llm.model": model, "llm.processor": processor}
+    ) as span:
+        check_deadline()
+        start = time.perf_counter()
+        try:
+            response = llm.invoke(messages)
+        except Exception:
+            _record_error(model, processor, time.perf_counter() - start)
+            raise
+
+        _record(span, model, processor, time.perf_counter() - start, token_usage(response))
+        return response
+
+
+class _CrewTaskSpans:
+    """
+    Crew task callback recording one span per finished task
+
+    CrewAI only reports tasks on completion, so each task span runs from
+    the previous task's completion (or kickoff) to its own.
+    """
+
+    def __init__(self, parent: Any):
+        self.parent = parent
+        self.last_finished = time.time_ns()
+
+    def __call__(self, output: Any):
+        finished = time.time_ns()
+        record_span(
+            "crew.task",
+            self.last_finished,
+            finished,
+            parent=self.parent,
+            attributes={
+                "crew.agent": str(getattr(output, "agent", "")),
+                "crew.task": str(getattr(output, "description", ""))[:200],
+            }
+        )
+        self.last_finished = finished
+        report_progress(
+            "crew_task",
+            agent=str(getattr(output, "agent", "")),
+            task=str(getattr(output, "description", ""))[:200]
+        )
+        # Stop the crew before its next task once the execution is cancelled or out of time
+        check_deadline()
+
+
+def kickoff_crew(crew: Any, llm: Any, processor: str) -> Any:
+    """
+    Run a CrewAI crew and record latency, token usage, errors and task spans
+
+    Args:
+        crew: The crew to kick off
+        llm: Chat model the crew's agents use
+        processor: Name of the calling crew class
+
+    Returns:
+        The crew output
+    """
+    model = model_name(llm)
+    with tracer.start_as_current_span(
+        "crew.kickoff",
+        attributes={"llm.model": model, "llm.processor": processor}
+    ) as span:
+        if getattr(crew, "task_callback", None) is None:
+            crew.task_callback = _CrewTaskSpans(span)
+
+        check_deadline()
+        start = time.perf_counter()
+        try:
+            result = crew.kickoff()
+        except Exception:
+            _record_error(model, processor, time.perf_counter() - start)
+            raise
+
+        metrics = getattr(result, "token_usage", None)
+        usage = {
+            "prompt_tokens": getattr(metrics, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(metrics, "completion_tokens", 0) or 0,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        _record(span, model, processor, time.perf_counter() - start, usage)
+        return result
@@ -1,7 +1,7 @@
 """
 API routes initialization
 """
-from app.api import workflows, executions, webhooks, use_cases
+from app.api import workflows, executions, webhooks, use_cases, admin, stats
 
-__all__ = ["workflows", "executions", "webhooks", "use_cases"]
+__all__ = ["workflows", "executions", "webhooks", "use_cases", "admin", "stats"]
 
@@ -0,0 +1,68 @@
+"""
+Admin API endpoints
+Operational endpoints guarded by the admin token
+"""
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any
+from app.core.database import get_db
+from app.core.profiling import profile_store
+from app.core.retention import retention_status, run_retention
+from app.core.security import require_admin
+from app.core.stats import rebuild_stats
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("/profiles", response_model=List[Dict[str, Any]])
+def list_profiles():
+    """
+    List stored request profiles, newest first
+    """
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    """
+    Get a request profile as collapsed stacks
+    
+    The output is one "frame;frame;frame count" line per stack and can be
+    fed to flamegraph.pl or imported into speedscope.
+    Stacks cover every thread of the process during the request, so they
+    include other requests in flight (see concurrent_requests in the list).
+    """
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile["stacks"]
+
+
+@router.get("/retention", response_model=Dict[str, Any])
+def get_retention_status():
+    """
+    Result of the last retention run and whether one is in progress
+    """
+    return retention_status()
+
+
+@router.post("/retention/run", status_code=202)
+def trigger_retention(background_tasks: BackgroundTasks):
+    """
+    Start a retention run now instead of waiting for the schedule
+    """
+    background_tasks.add_task(run_retention)
+    return {"message": "Retention run started"}
+
+
+@router.post("/stats/rebuild")
+def trigger_stats_rebuild(db: Session = Depends(get_db)):
+    """
+    Recompute the execution stats rollup from the executions table
+    """
+    return {"executions": rebuild_stats(db)}
@@ -1,96 +1,612 @@
 """
 API endpoints for workflow execution
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from datetime import datetime
-from typing import Dict, Any
-from app.core.database import get_db
-from app.models import Workflow, WorkflowExecution, AgentTask
-from app.schemas import WorkflowExecutionCreate, WorkflowExecutionResponse
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Any, List, Literal, Optional, Tuple
+import asyncio
+import functools
+import json
+import time
+from app.core.admission import executions_gate
+from app.core.batching import batching_options, micro_batcher
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db, get_read_db, is_replica_session, replica_router
+from app.core.deadlines import Deadline, enforce, execution_timeout
+from app.core.etags import etag_matches, not_modified, weak_etag
+from app.core.events import execution_events, track_progress
+from app.core.idempotency import IDEMPOTENCY_HEADER, REPLAYED_HEADER, input_hash
+from app.core.json_filters import json_condition
+from app.core.leases import claim_executions, renew_leases
+from app.core.pagination import NEXT_CURSOR_HEADER, NEXT_OFFSET_HEADER, keyset_page
+from app.core.payloads import offload_payloads
+from app.core.projection import parse_fields, project, summary_query
+from app.core.search import search_document, search_executions, upsert_documents
+from app.core.metrics import (
+    EXECUTIONS,
+    EXECUTION_DURATION,
+    EXECUTIONS_IN_PROGRESS
+)
+from app.core.scheduler import execution_scheduler, resolve_priority
+from app.core.status_writer import TERMINAL_STATUSES, status_writer
+from app.core.timing import StageTimer
+from app.core.workflow_cache import workflow_cache
+from app.core.tracing import capture_context, extract_context, record_error, tracer
+from app.models import WorkflowExecution, AgentTask
+from app.schemas import (
+    WorkflowExecutionCreate,
+    WorkflowExecutionBulkResponse,
+    WorkflowExecutionResponse,
+    ExecutionSearchHit,
+    AgentTaskResponse
+)
 from app.agents import (
     QuickLeadScorer,
     QuickEmailProcessor,
     QuickDocumentProcessor
 )
+from app.agents.llm import share_llm_calls, track_llm_usage
 from app.integrations import N8nIntegration, ZapierIntegration
 
 router = APIRouter(prefix="/executions", tags=["executions"])
 
 
+# Execution columns holding rolled-up LLM usage
+_USAGE_COLUMNS = ("llm_calls", "prompt_tokens", "completion_tokens", "total_tokens", "cost_usd")
+
+
+def _llm_usage(calls: List[Dict[str, Any]], prior: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Roll LLM usage up into execution columns, on top of the usage of
+    earlier attempts if given
+    """
+    prior = prior or {}
+    return {
+        "llm_calls": (prior.get("llm_calls") or 0) + len(calls),
+        "prompt_tokens": (prior.get("prompt_tokens") or 0) + sum(call["prompt_tokens"] for call in calls),
+        "completion_tokens": (prior.get("completion_tokens") or 0) + sum(call["completion_tokens"] for call in calls),
+        "total_tokens": (prior.get("total_tokens") or 0) + sum(call["total_tokens"] for call in calls),
+        "cost_usd": (prior.get("cost_usd") or 0.0) + sum(call["cost_usd"] for call in calls),
+    }
+
+
+def _llm_tasks(
+    execution_id: int,
+    calls: List[Dict[str, Any]],
+    workflow_type: str
+) -> List[Dict[str, Any]]:
+    """
+    One AgentTask row per LLM call
+    """
+    return [
+        {
+            "execution_id": execution_id,
+            "agent_name": call["processor"],
+            "agent_role": workflow_type,
+            "task_description": f"LLM call to {call['model']}",
+            "status": call["status"],
+            "model": call["model"],
+            "prompt_tokens": call["prompt_tokens"],
+            "completion_tokens": call["completion_tokens"],
+            "total_tokens": call["total_tokens"],
+            "latency_ms": int(round(call["latency_ms"])),
+            "cost_usd": call["cost_usd"],
+        }
+        for call in calls
+    ]
+
+
+def _process(workflow_type: str, input_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Run the agent processor of a workflow type (blocking; called in a worker thread)
+    """
+    if workflow_type == "lead_qualification":
+        scorer = QuickLeadScorer()
+        return scorer.score_lead(input_data)
+    
+    elif workflow_type == "email_processing":
+        processor = QuickEmailProcessor()
+        return processor.process_email(input_data)
+    
+    elif workflow_type == "document_automation":
+        processor = QuickDocumentProcessor()
+        return processor.process_document(input_data)
+    
+    return None
+
+
+# Workflow types whose processor can handle several inputs with one LLM call
+_BATCH_PROCESSORS = {
+    "lead_qualification": lambda inputs: QuickLeadScorer().score_leads(inputs),
+}
+
+
+def _process_batch(workflow_type: str, inputs: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """
+    Run the batch processor of a workflow type on a micro-batch (blocking)
+    
+    Returns:
+        Result and share of the LLM calls (usage split evenly) per input
+    """
+    with track_llm_usage() as calls:
+        results = _BATCH_PROCESSORS[workflow_type](inputs)
+    return list(zip(results, share_llm_calls(calls, len(inputs))))
+
+
+async def _run_processor(workflow: Any, input_data: Dict[str, Any], llm_calls: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Process an execution's input, coalesced with concurrent executions of
+    the same workflow when its type supports it and the workflow's
+    micro-batching window is open (see batching_options)
+    """
+    options = batching_options(workflow)
+    if workflow.workflow_type not in _BATCH_PROCESSORS or options["window_ms"] <= 0:
+        return await asyncio.to_thread(_process, workflow.workflow_type, input_data)
+    
+    result, calls = await micro_batcher.submit(
+        workflow.id,
+        input_data,
+        functools.partial(_process_batch, workflow.workflow_type),
+        options["window_ms"],
+        options["max_items"]
+    )
+    llm_calls.extend(calls)
+    return result
+
+
+async def _finish_execution(
+    execution_id: int,
+    workflow_id: int,
+    input_data: Dict[str, Any],
+    outcome: Dict[str, Any],
+    timer: StageTimer,
+    workflow_type: str,
+    llm_calls: List[Dict[str, Any]],
+    checkpoint: Optional[Dict[str, Any]] = None
+):
+    """
+    Hand the final state, stage timings and LLM usage (including that of
+    an earlier attempt's checkpoint) to the status writer and wait until
+    they are committed
+    
+    completed_at comes from the DB clock like started_at, while the
+    durations come from the monotonic clock of the runner. The stored
+    timings end when the final state is handed over; the wait for the
+    batched commit is timed as "persist" in the metrics only. Agent
+    tasks, the search document and the stats rollup commit together
+    with the final state.
+    """
+    timings = timer.as_dict()
+    values = {
+        **outcome,
+        **_llm_usage(llm_calls, checkpoint),
+        "timings": timings,
+        "duration_ms": int(round(timings["total"])),
+        "duration_seconds": int(round(timings["total"] / 1000)),
+    }
+    document = None
+    if "output_data" in outcome:
+        document = search_document(input_data, outcome["output_data"])
+    
+    with timer.stage("persist"):
+        await status_writer.finish(
+            execution_id,
+            workflow_id,
+            values,
+            agent_tasks=_llm_tasks(execution_id, llm_calls, workflow_type),
+            document=document
+        )
+    
+    EXECUTIONS.labels(workflow_type, outcome["status"]).inc()
+    EXECUTION_DURATION.labels(workflow_type, outcome["status"]).observe(
+        timer.total_ms() / 1000
+    )
+
+
 async def execute_workflow_async(
     execution_id: int,
-    workflow: Workflow,
+    workflow_id: int,
     input_data: Dict[str, Any],
-    db: Session
+    enqueued_at: Optional[float] = None,
+    trace_context: Optional[Dict[str, str]] = None,
+    checkpoint: Optional[Dict[str, Any]] = None
 ):
     """
     Execute workflow asynchronously
+    
+    Started by the execution scheduler once a slot is free. Reads the
+    workflow definition from the workflow cache and writes state
+    transitions through the status writer, so a run normally needs no
+    DB session of its own. The LLM processors block, so they run in a
+    worker thread to let other executions proceed. Each step is bounded
+    by the workflow's deadline; a timed-out run fails and a cancelled
+    one (see cancel_execution) is recorded as cancelled, both freeing
+    the slot right away while a worker thread still inside an LLM call
+    stops at its next check. A run cut off by shutdown is handed back
+    instead (see _requeue_execution); resuming it passes the checkpoint
+    it left, and an LLM result found there is not computed again.
+    Executions of a workflow with a micro-batching window share their
+    LLM request with the others arriving in the same window.
+    Records per-stage
+    timings (queued, llm, integration.*, persist) on the execution
+    record and traces the run as a continuation of the request that
+    enqueued it.
     """
+    with tracer.start_as_current_span(
+        "execute_workflow",
+        context=extract_context(trace_context),
+        attributes={"execution.id": execution_id, "workflow.id": workflow_id}
+    ):
+        await _run_execution(execution_id, workflow_id, input_data, enqueued_at, checkpoint or {})
+
+
+async def _run_execution(
+    execution_id: int,
+    workflow_id: int,
+    input_data: Dict[str, Any],
+    enqueued_at: Optional[float],
+    checkpoint: Dict[str, Any]
+):
+    """Body of execute_workflow_async, run inside its trace span"""
+    timer = StageTimer(enqueued_at)
+    workflow = None
+    deadline = None
+    llm_calls: List[Dict[str, Any]] = []
+    llm_done = "output_data" in checkpoint
+    result = checkpoint.get("output_data")
+    EXECUTIONS_IN_PROGRESS.inc()
+    
     try:
-        # Get workflow execution record
-        execution = db.query(WorkflowExecution).filter(
-            WorkflowExecution.id == execution_id
-        ).first()
-        
-        execution.status = "running"
-        db.commit()
-        
-        # Execute based on workflow type
-        result = None
-        
-        if workflow.workflow_type == "lead_qualification":
-            scorer = QuickLeadScorer()
-            result = scorer.score_lead(input_data)
+        try:
+            # Get the workflow; "running" is written with the next status flush
+            with timer.stage("persist"):
+                workflow = await workflow_cache.get_async(workflow_id)
+                if workflow is None:
+                    raise ValueError(f"Workflow {workflow_id} not found")
+                deadline = Deadline(execution_timeout(workflow))
+                status_writer.submit(execution_id, {
+                    "status": "running",
+                    "deadline_at": datetime.now(timezone.utc) + timedelta(seconds=deadline.seconds)
+                })
             
-        elif workflow.workflow_type == "email_processing":
-            processor = QuickEmailProcessor()
-            result = processor.process_email(input_data)
+            with enforce(deadline), track_progress(execution_id):
+                # Execute based on workflow type, unless an earlier attempt already did
+                if not llm_done:
+                    with timer.stage("llm"), track_llm_usage() as llm_calls:
+                        result = await deadline.run(_run_processor(workflow, input_data, llm_calls))
+                    llm_done = True
+                
+                # Trigger integrations if configured
+                if workflow.n8n_workflow_id:
+                    with timer.stage("integration.n8n"):
+                        n8n = N8nIntegration()
+                        await deadline.run(n8n.trigger_workflow(workflow.n8n_workflow_id, result))
+                
+                if workflow.zapier_webhook_url:
+                    with timer.stage("integration.zapier"):
+                        zapier = ZapierIntegration()
+                        await deadline.run(zapier.send_to_zapier(result, workflow.zapier_webhook_url))
             
-        elif workflow.workflow_type == "document_automation":
-            processor = QuickDocumentProcessor()
-            result = processor.process_document(input_data)
-        
-        # Trigger integrations if configured
-        if workflow.n8n_workflow_id:
-            n8n = N8nIntegration()
-            await n8n.trigger_workflow(workflow.n8n_workflow_id, result)
-        
-        if workflow.zapier_webhook_url:
-            zapier = ZapierIntegration()
-            await zapier.send_to_zapier(result, workflow.zapier_webhook_url)
+            outcome = {"status": "completed", "output_data": result}
+            
+        except asyncio.CancelledError:
+            # Cancelled through the API or by shutdown: let the worker thread stop at its next check
+            if deadline is not None:
+                deadline.cancelled = True
+            asyncio.current_task().uncancel()
+            if execution_scheduler.draining:
+                await _requeue_execution(
+                    execution_id,
+                    workflow.workflow_type if workflow else "unknown",
+                    list(llm_calls),
+                    checkpoint,
+                    {"output_data": result} if llm_done else {}
+                )
+                return
+            outcome = {"status": "cancelled", "error_message": "Cancelled by request"}
+            
+        except Exception as e:
+            record_error(e)
+            outcome = {"status": "failed", "error_message": str(e)}
         
         # Update execution record
-        execution.status = "completed"
-        execution.output_data = result
-        execution.completed_at = datetime.utcnow()
-        
-        if execution.started_at:
-            duration = (execution.completed_at - execution.started_at).total_seconds()
-            execution.duration_seconds = int(duration)
-        
+        await _finish_execution(
+            execution_id,
+            workflow_id,
+            input_data,
+            outcome,
+            timer,
+            workflow.workflow_type if workflow else "unknown",
+            llm_calls,
+            checkpoint
+        )
+    
+    finally:
+        EXECUTIONS_IN_PROGRESS.dec()
+
+
+def _enqueue(
+    workflow: Any,
+    execution_id: int,
+    priority: str,
+    input_data: Dict[str, Any],
+    enqueued_at: float,
+    trace_context: Optional[Dict[str, str]] = None,
+    checkpoint: Optional[Dict[str, Any]] = None
+):
+    """Queue an execution on this process's scheduler"""
+    execution_scheduler.submit(workflow, execution_id, priority, functools.partial(
+        execute_workflow_async,
+        execution_id,
+        workflow.id,
+        input_data,
+        enqueued_at,
+        trace_context,
+        checkpoint
+    ))
+
+
+async def _requeue_execution(
+    execution_id: int,
+    workflow_type: str,
+    llm_calls: List[Dict[str, Any]],
+    checkpoint: Dict[str, Any],
+    progress: Dict[str, Any]
+):
+    """
+    Hand a run interrupted by shutdown back for another process to resume
+    
+    The row returns to pending, without a lease and, with local dispatch,
+    with requeued_at set. It keeps the LLM usage of all attempts so far,
+    with agent tasks for this attempt's calls, and the LLM result as
+    output_data when it was obtained, so the next attempt only runs what
+    is left.
+    """
+    await status_writer.checkpoint(
+        execution_id,
+        {
+            "status": "pending",
+            **_hand_back_values(datetime.now(timezone.utc)),
+            "deadline_at": None,
+            **progress,
+            **_llm_usage(llm_calls, checkpoint),
+        },
+        agent_tasks=_llm_tasks(execution_id, llm_calls, workflow_type)
+    )
+
+
+def _hand_back_values(now: Any) -> Dict[str, Any]:
+    """
+    Columns that make an execution available to other processes: its
+    lease released and, with local dispatch, requeued_at set for the
+    requeue loop (database dispatch claims any unleased pending row)
+    """
+    values = {"claimed_by": None, "lease_expires_at": None}
+    if settings.EXECUTION_DISPATCH != "database":
+        values["requeued_at"] = now
+    return values
+
+
+def requeue_executions(execution_ids: List[int]):
+    """
+    Hand executions that never started back for another process to run
+    
+    Blocking, so call it from a worker thread.
+    """
+    table = WorkflowExecution.__table__
+    with SessionLocal() as db:
+        for start in range(0, len(execution_ids), settings.BULK_CHUNK_SIZE):
+            db.execute(
+                update(table)
+                .where(
+                    table.c.id.in_(execution_ids[start:start + settings.BULK_CHUNK_SIZE]),
+                    table.c.status == "pending"
+                )
+                .values(_hand_back_values(func.now()))
+            )
         db.commit()
-        
-    except Exception as e:
-        execution.status = "failed"
-        execution.error_message = str(e)
-        execution.completed_at = datetime.utcnow()
+
+
+def _claim_requeued(limit: int) -> List[WorkflowExecution]:
+    """
+    Take up to `limit` requeued executions, oldest first
+    
+    Clearing requeued_at is the claim: the condition is re-checked on
+    each row as it is updated, so concurrent claims never share one.
+    """
+    table = WorkflowExecution.__table__
+    with SessionLocal() as db:
+        candidates = (
+            select(table.c.id)
+            .where(table.c.requeued_at.isnot(None))
+            .order_by(table.c.requeued_at)
+            .limit(limit)
+        )
+        execution_ids = db.execute(
+            update(table)
+            .where(table.c.id.in_(candidates), table.c.requeued_at.isnot(None), table.c.status == "pending")
+            .values(requeued_at=None)
+            .returning(table.c.id)
+        ).scalars().all()
         db.commit()
+        if not execution_ids:
+            return []
+        return db.query(WorkflowExecution).filter(
+            WorkflowExecution.id.in_(execution_ids)
+        ).order_by(WorkflowExecution.id).all()
+
+
+async def _resume(claim: Callable[[int], List[WorkflowExecution]], limit: int) -> int:
+    """
+    Claim up to `limit` executions with `claim` (run in a worker thread)
+    and queue them here, continuing from the checkpoint each one left
+    
+    Returns:
+        Number of executions claimed
+    """
+    claiming = asyncio.ensure_future(asyncio.to_thread(claim, limit))
+    try:
+        executions = await asyncio.shield(claiming)
+    except asyncio.CancelledError:
+        # Shutting down mid-claim: hand the claimed executions straight back
+        requeue_executions([execution.id for execution in await claiming])
+        raise
+    
+    for execution in executions:
+        workflow = await workflow_cache.get_async(execution.workflow_id)
+        if workflow is None:
+            await status_writer.finish(
+                execution.id,
+                execution.workflow_id,
+                {"status": "failed", "error_message": f"Workflow {execution.workflow_id} not found"}
+            )
+            continue
+        checkpoint = {column: getattr(execution, column) for column in _USAGE_COLUMNS}
+        if execution.output_data is not None:
+            checkpoint["output_data"] = execution.output_data
+        priority = execution.priority or resolve_priority(workflow, None, "interactive")
+        _enqueue(workflow, execution.id, priority, execution.input_data, time.perf_counter(), None, checkpoint)
+    return len(executions)
+
+
+async def resume_requeued_executions() -> int:
+    """
+    Queue executions handed back by processes that shut down, as many
+    as the executions admission limit leaves room for
+    
+    Returns:
+        Number of executions queued
+    """
+    limit = settings.ADMISSION_LIMITS.get("executions", 0)
+    room = limit - execution_scheduler.load() if limit else settings.BULK_CHUNK_SIZE
+    if room <= 0:
+        return 0
+    return await _resume(_claim_requeued, room)
+
+
+async def requeue_loop():
+    """Resume requeued executions every EXECUTION_REQUEUE_POLL_SECONDS until cancelled"""
+    while True:
+        try:
+            resumed = await resume_requeued_executions()
+            if resumed:
+                print(f"♻️ Resumed {resumed} requeued execution(s)")
+        except Exception as e:
+            print(f"⚠️ Resuming requeued executions failed: {e}")
+        await asyncio.sleep(settings.EXECUTION_REQUEUE_POLL_SECONDS)
+
+
+# Set to claim right away instead of at the next poll (e.g. after a local create)
+_claim_wakeup: Optional[asyncio.Event] = None
+
+
+def _wake_claimer():
+    if _claim_wakeup is not None:
+        _claim_wakeup.set()
+
+
+async def claim_loop():
+    """
+    Run executions claimed from the database (EXECUTION_DISPATCH=database) until cancelled
+    
+    Claims whenever the local scheduler holds less than twice
+    EXECUTION_CONCURRENCY, at most EXECUTION_CLAIM_BATCH at a time:
+    straight away after a local create or a full batch, otherwise every
+    EXECUTION_CLAIM_POLL_MS. Leases on everything queued or running here
+    are renewed every third of EXECUTION_LEASE_SECONDS, so they only
+    expire, and pass to other instances, once this process stops.
+    """
+    global _claim_wakeup
+    _claim_wakeup = asyncio.Event()
+    renewed = time.monotonic()
+    
+    while True:
+        room = min(settings.EXECUTION_CLAIM_BATCH, 2 * settings.EXECUTION_CONCURRENCY - execution_scheduler.load())
+        claimed = 0
+        try:
+            if time.monotonic() - renewed >= settings.EXECUTION_LEASE_SECONDS / 3:
+                await asyncio.to_thread(renew_leases, execution_scheduler.execution_ids())
+                renewed = time.monotonic()
+            if room > 0:
+                claimed = await _resume(claim_executions, room)
+        except Exception as e:
+            print(f"⚠️ Claiming executions failed: {e}")
+        
+        if room <= 0 or claimed < room:
+            try:
+                await asyncio.wait_for(_claim_wakeup.wait(), settings.EXECUTION_CLAIM_POLL_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+            _claim_wakeup.clear()
+
+
+def _find_duplicate(
+    db: Session,
+    workflow_id: int,
+    idempotency_key: Optional[str],
+    digest: str
+) -> Optional[WorkflowExecution]:
+    """
+    Earlier execution a creation request repeats, if any
+    
+    With an Idempotency-Key that is the execution created with the same
+    key, whatever its status; without one, the latest execution of the
+    same input within IDEMPOTENCY_WINDOW_SECONDS that has not failed or
+    been cancelled.
+    
+    Raises:
+        HTTPException: 422 if the key was used with a different input
+    """
+    query = db.query(WorkflowExecution).filter(WorkflowExecution.workflow_id == workflow_id)
+    
+    if idempotency_key is not None:
+        execution = query.filter(WorkflowExecution.idempotency_key == idempotency_key).first()
+        if execution is not None and execution.input_hash != digest:
+            raise HTTPException(
+                status_code=422,
+                detail=f"{IDEMPOTENCY_HEADER} was already used with a different input"
+            )
+        return execution
+    
+    if settings.IDEMPOTENCY_WINDOW_SECONDS <= 0:
+        return None
+    since = datetime.now(timezone.utc) - timedelta(seconds=settings.IDEMPOTENCY_WINDOW_SECONDS)
+    return query.filter(
+        WorkflowExecution.input_hash == digest,
+        WorkflowExecution.started_at >= since,
+        WorkflowExecution.status.notin_(("failed", "cancelled"))
+    ).order_by(WorkflowExecution.id.desc()).first()
 
 
 @router.post("/", response_model=WorkflowExecutionResponse)
 async def create_execution(
     execution_data: WorkflowExecutionCreate,
-    background_tasks: BackgroundTasks,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
     db: Session = Depends(get_db)
 ):
     """
     Create and execute a workflow
+    
+    Retried and double-submitted requests don't run again: repeating the
+    Idempotency-Key of an earlier request for the workflow, or without a
+    key repeating an input submitted within IDEMPOTENCY_WINDOW_SECONDS
+    that has not failed or been cancelled, returns the existing execution (pending, running
+    or finished) with an Idempotent-Replayed: true header. The unique
+    (workflow_id, idempotency_key) index settles keyed requests racing
+    across processes. New executions are refused with 429 while the
+    executions queued or running (in the database with
+    EXECUTION_DISPATCH=database) reach ADMISSION_LIMITS["executions"].
+    
+    The execution runs in the "interactive" priority class unless the
+    request or the workflow's scheduling config names another one.
     """
     # Get workflow
-    workflow = db.query(Workflow).filter(
-        Workflow.id == execution_data.workflow_id
-    ).first()
+    workflow = workflow_cache.get(execution_data.workflow_id, db)
     
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
@@ -98,42 +614,462 @@ async def create_execution(
     if not workflow.is_active:
         raise HTTPException(status_code=400, detail="Workflow is not active")
     
+    digest = input_hash(execution_data.input_data)
+    existing = _find_duplicate(db, workflow.id, idempotency_key, digest)
+    if existing is not None:
+        response.headers[REPLAYED_HEADER] = "true"
+        return existing
+    
+    executions_gate.admit()
+    priority = resolve_priority(workflow, execution_data.priority, "interactive")
+    
     # Create execution record
     db_execution = WorkflowExecution(
         workflow_id=execution_data.workflow_id,
         input_data=execution_data.input_data,
+        idempotency_key=idempotency_key,
+        input_hash=digest,
+        priority=priority,
         status="pending"
     )
     db.add(db_execution)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Same key created concurrently by another process
+        db.rollback()
+        existing = _find_duplicate(db, workflow.id, idempotency_key, digest)
+        if existing is None:
+            raise
+        response.headers[REPLAYED_HEADER] = "true"
+        return existing
     db.refresh(db_execution)
+    replica_router.mark_written("execution_id", db_execution.id)
+    replica_router.mark_written("workflow_id", workflow.id)
     
     # Execute workflow in background
-    background_tasks.add_task(
-        execute_workflow_async,
-        db_execution.id,
-        workflow,
-        execution_data.input_data,
-        db
-    )
+    with tracer.start_as_current_span(
+        "execution.enqueue",
+        attributes={"execution.id": db_execution.id, "workflow.id": workflow.id, "execution.priority": priority}
+    ):
+        if settings.EXECUTION_DISPATCH == "database":
+            # Left pending for whichever instance claims it first
+            _wake_claimer()
+        else:
+            _enqueue(workflow, db_execution.id, priority, execution_data.input_data, time.perf_counter(), capture_context())
     
     return db_execution
 
 
+async def _read_bulk_inputs(request: Request) -> List[Dict[str, Any]]:
+    """
+    Execution inputs from a JSON array body, or from an NDJSON body
+    (application/x-ndjson, one object per line) read as a stream
+    """
+    def parse(raw: bytes, position: str) -> Any:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON {position}")
+    
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        inputs = []
+        buffer = b""
+        line_number = 0
+        async for chunk in request.stream():
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for line in lines:
+                line_number += 1
+                if line.strip():
+                    inputs.append(parse(line, f"on line {line_number}"))
+        if buffer.strip():
+            inputs.append(parse(buffer, f"on line {line_number + 1}"))
+    else:
+        inputs = parse(await request.body(), "body")
+        if not isinstance(inputs, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of execution inputs")
+    
+    if not inputs:
+        raise HTTPException(status_code=400, detail="No execution inputs given")
+    if len(inputs) > settings.BULK_MAX_EXECUTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_MAX_EXECUTIONS} executions per request"
+        )
+    for index, input_data in enumerate(inputs):
+        if not isinstance(input_data, dict):
+            raise HTTPException(status_code=400, detail=f"Input {index} is not a JSON object")
+    return inputs
+
+
+def _insert_executions(
+    db: Session,
+    workflow_id: int,
+    priority: str,
+    inputs: List[Dict[str, Any]]
+) -> List[int]:
+    """
+    Insert pending executions in one transaction
+    
+    Rows go in as multi-row INSERT ... RETURNING statements of
+    BULK_CHUNK_SIZE rows, with large inputs offloaded to blobs and
+    search documents written alongside, as the ORM hooks would.
+    
+    Returns:
+        Execution ids in input order
+    """
+    table = WorkflowExecution.__table__
+    connection = db.connection()
+    stmt = table.insert().returning(table.c.id, sort_by_parameter_order=True)
+    
+    execution_ids: List[int] = []
+    for start in range(0, len(inputs), settings.BULK_CHUNK_SIZE):
+        chunk = inputs[start:start + settings.BULK_CHUNK_SIZE]
+        rows = [
+            offload_payloads(connection, {
+                "workflow_id": workflow_id,
+                "status": "pending",
+                "priority": priority,
+                "input_data": input_data,
+                "input_hash": input_hash(input_data),
+            })
+            for input_data in chunk
+        ]
+        chunk_ids = connection.execute(stmt, rows).scalars().all()
+        
+        documents = []
+        for execution_id, input_data in zip(chunk_ids, chunk):
+            document = search_document(input_data, None)
+            if document:
+                documents.append({"execution_id": execution_id, "document": document})
+        if documents:
+            upsert_documents(db, documents)
+        execution_ids.extend(chunk_ids)
+    
+    db.commit()
+    return execution_ids
+
+
+@router.post(
+    "/bulk",
+    response_model=WorkflowExecutionBulkResponse,
+    status_code=202,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    }
+)
+async def create_executions_bulk(
+    request: Request,
+    workflow_id: int = Query(...),
+    priority: Optional[Literal["interactive", "webhook", "bulk"]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Create and execute many executions of one workflow
+    
+    The body is a JSON array of input objects or an NDJSON stream with
+    one input object per line. The workflow is checked once and all
+    executions are inserted in a single transaction, then queued in
+    input order in the "bulk" priority class unless `priority` or the
+    workflow's scheduling config names another one.
+    
+    The request is refused with 429 unless all its inputs fit under
+    ADMISSION_LIMITS["executions"], and with 413 if they never can.
+    
+    Returns the id range: ids ascend in input order from first_id to
+    last_id, though executions created concurrently by other requests
+    may fall within the range.
+    """
+    workflow = workflow_cache.get(workflow_id, db)
+    
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    if not workflow.is_active:
+        raise HTTPException(status_code=400, detail="Workflow is not active")
+    
+    inputs = await _read_bulk_inputs(request)
+    # Admitted whole only if all its inputs fit under the limit
+    executions_gate.admit(len(inputs))
+    priority = resolve_priority(workflow, priority, "bulk")
+    execution_ids = await asyncio.to_thread(_insert_executions, db, workflow.id, priority, inputs)
+    replica_router.mark_written("workflow_id", workflow.id)
+    
+    with tracer.start_as_current_span(
+        "execution.enqueue_bulk",
+        attributes={
+            "workflow.id": workflow.id,
+            "execution.count": len(execution_ids),
+            "execution.priority": priority
+        }
+    ):
+        if settings.EXECUTION_DISPATCH == "database":
+            _wake_claimer()
+        else:
+            enqueued_at = time.perf_counter()
+            trace_context = capture_context()
+            for execution_id, input_data in zip(execution_ids, inputs):
+                _enqueue(workflow, execution_id, priority, input_data, enqueued_at, trace_context)
+    
+    return {
+        "workflow_id": workflow.id,
+        "count": len(execution_ids),
+        "first_id": execution_ids[0],
+        "last_id": execution_ids[-1]
+    }
+
+
+@router.get(
+    "/",
+    response_model=List[WorkflowExecutionResponse],
+    response_model_exclude_unset=True
+)
+def list_executions(
+    response: Response,
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    workflow_id: Optional[int] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    where: List[str] = Query([]),
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db)
+):
+    """
+    List executions across workflows, newest first
+    
+    Filters map onto the composite (status, started_at) and
+    (workflow_id, started_at, id) indexes, so each page costs the same
+    regardless of depth. Pass the X-Next-Cursor response header back as
+    `cursor` to get the next page; a cursor whose execution has since
+    been deleted gets 400.
+    
+    Returns summaries without the input_data, output_data and agent_logs
+    payloads; opt into them with e.g. `fields=output_data`. Full detail
+    of a single execution is available from GET /executions/{id}.
+    
+    `where` filters on payload fields and may be repeated, e.g.
+    `where=output_data.lead_score>=80&where=input_data.source=webinar`.
+    On Postgres equality uses the JSONB GIN indexes and ranges the
+    expression indexes on hot keys.
+    """
+    fields = parse_fields(fields)
+    query = summary_query(db.query(WorkflowExecution), fields)
+    
+    if status:
+        query = query.filter(WorkflowExecution.status == status)
+    if workflow_id is not None:
+        query = query.filter(WorkflowExecution.workflow_id == workflow_id)
+    if started_after:
+        query = query.filter(WorkflowExecution.started_at >= started_after)
+    if started_before:
+        query = query.filter(WorkflowExecution.started_at < started_before)
+    
+    dialect = db.get_bind().dialect.name
+    for condition in where:
+        query = query.filter(json_condition(dialect, condition))
+    
+    executions, next_cursor = keyset_page(query, cursor, limit)
+    
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+    return [project(execution, fields) for execution in executions]
+
+
+@router.get("/search", response_model=List[ExecutionSearchHit])
+def search_executions_endpoint(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500),
+    workflow_id: Optional[int] = None,
+    offset: int = Query(0, ge=0, le=10000),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Full-text search over email subjects and bodies, lead companies and
+    messages and extracted document fields, best match first
+    
+    Pass the X-Next-Offset response header back as `offset` to get the
+    next page.
+    """
+    hits = search_executions(db, q, workflow_id, limit, offset)
+    
+    executions = {
+        execution.id: execution
+        for execution in summary_query(db.query(WorkflowExecution), []).filter(
+            WorkflowExecution.id.in_([execution_id for execution_id, _, _ in hits])
+        )
+    }
+    
+    if len(hits) == limit:
+        response.headers[NEXT_OFFSET_HEADER] = str(offset + limit)
+    return [
+        {**project(executions[execution_id], []), "rank": rank, "snippet": snippet}
+        for execution_id, rank, snippet in hits if execution_id in executions
+    ]
+
+
 @router.get("/{execution_id}", response_model=WorkflowExecutionResponse)
 def get_execution(
     execution_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get execution status and results
+    
+    Served from a read replica unless this process wrote the execution
+    within the replication window; an execution a replica does not have
+    yet (e.g. created through another instance) is looked up on the
+    primary before answering 404.
+    
+    The response carries a weak ETag from the execution's version
+    counter. A request whose If-None-Match still matches gets 304 after
+    reading only that counter, without loading or serializing the row.
     """
+    if if_none_match:
+        version = db.execute(
+            select(WorkflowExecution.version).where(WorkflowExecution.id == execution_id)
+        ).scalar()
+        etag = weak_etag("execution", execution_id, version)
+        if version is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
     execution = db.query(WorkflowExecution).filter(
         WorkflowExecution.id == execution_id
     ).first()
     
+    if not execution and is_replica_session(db):
+        with SessionLocal() as primary:
+            execution = primary.query(WorkflowExecution).filter(
+                WorkflowExecution.id == execution_id
+            ).first()
+    
     if not execution:
         raise HTTPException(status_code=404, detail="Execution not found")
     
+    response.headers["ETag"] = weak_etag("execution", execution.id, execution.version)
     return execution
 
+
+@router.post("/{execution_id}/cancel", response_model=WorkflowExecutionResponse)
+async def cancel_execution(
+    execution_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Cancel a pending or running execution
+    
+    A queued execution is dropped before it runs; a running one stops
+    at its current step and gives up its slot before this returns. An
+    execution this process does not hold (queued or running elsewhere,
+    or orphaned by a stopped worker) is marked cancelled directly, and
+    later writes of its runner are ignored.
+    """
+    execution = db.query(WorkflowExecution).filter(
+        WorkflowExecution.id == execution_id
+    ).first()
+    
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if execution.status in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Execution is already {execution.status}")
+    
+    if await execution_scheduler.cancel(execution_id) != "running":
+        await status_writer.finish(
+            execution_id,
+            execution.workflow_id,
+            {"status": "cancelled", "error_message": "Cancelled by request"}
+        )
+    
+    db.refresh(execution)
+    return execution
+
+
+def _execution_state(execution_id: int) -> Optional[Dict[str, Any]]:
+    """Status columns of an execution, read from the primary (blocking)"""
+    table = WorkflowExecution.__table__
+    with SessionLocal() as db:
+        row = db.execute(
+            select(table.c.status, table.c.error_message, table.c.duration_ms).where(table.c.id == execution_id)
+        ).first()
+    if row is None:
+        return None
+    return {name: value for name, value in row._mapping.items() if value is not None}
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _event_stream(execution_id: int):
+    """
+    Current status, then the execution's events until a terminal status,
+    with a comment line every EXECUTION_EVENTS_KEEPALIVE_SECONDS of quiet
+    """
+    # Subscribe before reading the status so no transition falls in between
+    queue = execution_events.subscribe(execution_id)
+    try:
+        state = await asyncio.to_thread(_execution_state, execution_id)
+        if state is None:
+            return
+        yield _sse("status", {"execution_id": execution_id, **state})
+        if state["status"] in TERMINAL_STATUSES:
+            return
+        
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), settings.EXECUTION_EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse(message["event"], {"execution_id": execution_id, **message["data"]})
+            if message["event"] == "status" and message["data"].get("status") in TERMINAL_STATUSES:
+                return
+    finally:
+        execution_events.unsubscribe(execution_id, queue)
+
+
+@router.get("/{execution_id}/events")
+async def stream_execution_events(execution_id: int):
+    """
+    Stream an execution's status transitions and agent progress (Server-Sent Events)
+    
+    Starts with a "status" event carrying the current status, followed
+    by "status" events as the execution moves on and "progress" events
+    as its agents finish LLM calls (kind llm_call) and crew tasks (kind
+    crew_task). The stream ends after a terminal status; fetch
+    GET /executions/{id} then for the output. Watchers are served from
+    the event bus, so they add no database load while they wait.
+    """
+    if await asyncio.to_thread(_execution_state, execution_id) is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    return StreamingResponse(
+        _event_stream(execution_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{execution_id}/tasks", response_model=List[AgentTaskResponse])
+def list_execution_tasks(
+    execution_id: int,
+    db: Session = Depends(get_read_db)
+):
+    """
+    List agent tasks (one per LLM call) with their token usage and cost
+    """
+    return db.query(AgentTask).filter(
+        AgentTask.execution_id == execution_id
+    ).order_by(AgentTask.id).all()
@@ -0,0 +1,27 @@
+"""
+API endpoints for execution statistics
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.database import get_read_db
+from app.core.stats import load_stats
+from app.schemas import ExecutionStatsResponse
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/", response_model=ExecutionStatsResponse)
+def get_stats(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    workflow_id: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Execution counts, latency percentiles and LLM usage over the last `hours`
+    
+    Served from the hourly execution_stats rollup, so the cost depends on
+    the window size rather than the number of executions. Percentiles are
+    estimated from a fixed latency histogram.
+    """
+    return load_stats(db, hours, workflow_id)
@@ -2,9 +2,20 @@
 API endpoints for specific use cases
 Simplified endpoints for demonstration purposes
 """
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, BackgroundTasks, Header, HTTPException, Response
 from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+from app.core.admission import use_cases_gate
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.idempotency import (
+    IDEMPOTENCY_HEADER,
+    REPLAYED_HEADER,
+    RecentResults,
+    SingleFlight,
+    input_hash
+)
 from app.schemas import (
     LeadInput,
     LeadQualificationResult,
@@ -19,12 +30,75 @@ from app.agents import (
     QuickDocumentProcessor
 )
 
-router = APIRouter(prefix="/use-cases", tags=["use-cases"])
+# Requests beyond ADMISSION_LIMITS["use_cases"] in progress get 429
+router = APIRouter(prefix="/use-cases", tags=["use-cases"], dependencies=[Depends(use_cases_gate.hold)])
+
+# Identical calls share one LLM run while in flight and its result for a while after
+_flights = SingleFlight()
+_results = RecentResults()
+
+
+async def _run_once(
+    use_case: str,
+    data: Dict[str, Any],
+    idempotency_key: Optional[str],
+    process: Callable[[Dict[str, Any]], Dict[str, Any]]
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Run a use case once per Idempotency-Key, or per input within
+    IDEMPOTENCY_WINDOW_SECONDS when no key is given
+    
+    The processor runs in a worker thread, so identical requests arriving
+    meanwhile attach to the running call instead of starting their own.
+    Only successful results are remembered, per process.
+    
+    Returns:
+        The result and whether it was replayed from another request
+    
+    Raises:
+        HTTPException: 422 if the key was used with a different input
+    """
+    digest = input_hash(data)
+    if idempotency_key is None and settings.IDEMPOTENCY_WINDOW_SECONDS <= 0:
+        return await asyncio.to_thread(process, data), False
+    
+    key = (use_case, "key", idempotency_key) if idempotency_key else (use_case, "input", digest)
+    cached = _results.get(key)
+    if cached is not None:
+        cached_digest, result = cached
+        if cached_digest != digest:
+            raise _key_reused()
+        return result, True
+    
+    in_flight = _flights.digest(key)
+    if in_flight is not None and in_flight != digest:
+        raise _key_reused()
+    
+    result, shared = await _flights.run(key, lambda: asyncio.to_thread(process, data), digest)
+    if not shared and _succeeded(result):
+        _results.put(key, digest, result, keyed=idempotency_key is not None)
+    return result, shared
+
+
+def _key_reused() -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail=f"{IDEMPOTENCY_HEADER} was already used with a different input"
+    )
+
+
+def _succeeded(result: Any) -> bool:
+    """Whether a processor result (or every item of a list of them) is not a failure"""
+    if isinstance(result, list):
+        return all(_succeeded(item) for item in result)
+    return not (isinstance(result, dict) and result.get("status") == "failed")
 
 
 @router.post("/qualify-lead", response_model=dict)
 async def qualify_lead(
     lead: LeadInput,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
     db: Session = Depends(get_db)
 ):
     """
@@ -36,9 +110,13 @@ async def qualify_lead(
         # Convert lead to dict
         lead_data = lead.dict()
         
-        # Process with AI agent
-        scorer = QuickLeadScorer()
-        result = scorer.score_lead(lead_data)
+        # Process with AI agent (deduplicated)
+        result, replayed = await _run_once(
+            "qualify-lead", lead_data, idempotency_key,
+            lambda data: QuickLeadScorer().score_lead(data)
+        )
+        if replayed:
+            response.headers[REPLAYED_HEADER] = "true"
         
         return {
             "status": "success",
@@ -47,6 +125,8 @@ async def qualify_lead(
             "message": "Lead qualified successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "status": "error",
@@ -57,6 +137,8 @@ async def qualify_lead(
 @router.post("/process-email", response_model=dict)
 async def process_email(
     email: EmailInput,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
     db: Session = Depends(get_db)
 ):
     """
@@ -68,9 +150,13 @@ async def process_email(
         # Convert email to dict
         email_data = email.dict()
         
-        # Process with AI agent
-        processor = QuickEmailProcessor()
-        result = processor.process_email(email_data)
+        # Process with AI agent (deduplicated)
+        result, replayed = await _run_once(
+            "process-email", email_data, idempotency_key,
+            lambda data: QuickEmailProcessor().process_email(data)
+        )
+        if replayed:
+            response.headers[REPLAYED_HEADER] = "true"
         
         return {
             "status": "success",
@@ -79,6 +165,8 @@ async def process_email(
             "message": "Email processed successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "status": "error",
@@ -89,6 +177,8 @@ async def process_email(
 @router.post("/process-document", response_model=dict)
 async def process_document(
     document: DocumentInput,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
     db: Session = Depends(get_db)
 ):
     """
@@ -100,9 +190,13 @@ async def process_document(
         # Convert document to dict
         document_data = document.dict()
         
-        # Process with AI agent
-        processor = QuickDocumentProcessor()
-        result = processor.process_document(document_data)
+        # Process with AI agent (deduplicated)
+        result, replayed = await _run_once(
+            "process-document", document_data, idempotency_key,
+            lambda data: QuickDocumentProcessor().process_document(data)
+        )
+        if replayed:
+            response.headers[REPLAYED_HEADER] = "true"
         
         return {
             "status": "success",
@@ -111,6 +205,8 @@ async def process_document(
             "message": "Document processed successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "status": "error",
@@ -126,13 +222,16 @@ async def process_lead_batch(
 ):
     """
     Demo endpoint: Process multiple leads in batch
+    
+    Leads repeated within the batch or recently qualified are not
+    scored again.
     """
     results = []
     scorer = QuickLeadScorer()
     
     for lead in leads:
         try:
-            result = scorer.score_lead(lead.dict())
+            result, _ = await _run_once("qualify-lead", lead.dict(), None, scorer.score_lead)
             results.append({
                 "lead": lead.dict(),
                 "result": result,
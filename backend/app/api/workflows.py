@@ -1,17 +1,26 @@
 """
 API endpoints for workflow management
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from sqlalchemy import func, select
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from app.core.database import SessionLocal, get_db, get_read_db, is_replica_session, replica_router
+from app.core.etags import etag_matches, list_etag, not_modified, weak_etag
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_page
+from app.core.projection import parse_fields, project, summary_query
+from app.core.timing import summarize_timings
+from app.core.workflow_cache import workflow_cache
 from app.models import Workflow, WorkflowExecution
 from app.schemas import (
     WorkflowCreate,
     WorkflowUpdate,
     WorkflowResponse,
     WorkflowExecutionCreate,
-    WorkflowExecutionResponse
+    WorkflowExecutionResponse,
+    WorkflowTimingsResponse,
+    WorkflowUsageResponse
 )
 
 router = APIRouter(prefix="/workflows", tags=["workflows"])
@@ -19,14 +28,30 @@ router = APIRouter(prefix="/workflows", tags=["workflows"])
 
 @router.get("/", response_model=List[WorkflowResponse])
 def list_workflows(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
 ):
     """
     List all workflows
+    
+    The weak ETag covers the id and version of every workflow on the
+    page, which is all that is read to answer a matching If-None-Match
+    with 304.
     """
-    workflows = db.query(Workflow).offset(skip).limit(limit).all()
+    versions = db.execute(
+        select(Workflow.id, Workflow.version).order_by(Workflow.id).offset(skip).limit(limit)
+    ).all()
+    etag = list_etag("workflows", versions)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    workflows = db.query(Workflow).filter(
+        Workflow.id.in_([workflow_id for workflow_id, _ in versions])
+    ).order_by(Workflow.id).all()
+    response.headers["ETag"] = etag
     return workflows
 
 
@@ -42,20 +67,36 @@ def create_workflow(
     db.add(db_workflow)
     db.commit()
     db.refresh(db_workflow)
+    replica_router.mark_written("workflow_id", db_workflow.id)
     return db_workflow
 
 
 @router.get("/{workflow_id}", response_model=WorkflowResponse)
 def get_workflow(
     workflow_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get a specific workflow by ID
+    
+    A matching If-None-Match gets 304 after reading only the version counter.
     """
+    if if_none_match:
+        version = db.execute(select(Workflow.version).where(Workflow.id == workflow_id)).scalar()
+        etag = weak_etag("workflow", workflow_id, version)
+        if version is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
     workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
+    if not workflow and is_replica_session(db):
+        # Possibly created through another instance and not replicated yet
+        with SessionLocal() as primary:
+            workflow = primary.query(Workflow).filter(Workflow.id == workflow_id).first()
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
+    response.headers["ETag"] = weak_etag("workflow", workflow.id, workflow.version)
     return workflow
 
 
@@ -79,6 +120,8 @@ def update_workflow(
     
     db.commit()
     db.refresh(db_workflow)
+    workflow_cache.invalidate(workflow_id)
+    replica_router.mark_written("workflow_id", workflow_id)
     return db_workflow
 
 
@@ -96,22 +139,93 @@ def delete_workflow(
     
     db.delete(db_workflow)
     db.commit()
+    workflow_cache.invalidate(workflow_id)
+    replica_router.mark_written("workflow_id", workflow_id)
     return {"message": "Workflow deleted successfully"}
 
 
-@router.get("/{workflow_id}/executions", response_model=List[WorkflowExecutionResponse])
+@router.get(
+    "/{workflow_id}/executions",
+    response_model=List[WorkflowExecutionResponse],
+    response_model_exclude_unset=True
+)
 def list_workflow_executions(
     workflow_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    response: Response,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db)
 ):
     """
-    List all executions for a specific workflow
+    List executions for a specific workflow, newest first
+    
+    Returns summaries without input_data, output_data and agent_logs;
+    request them with e.g. `fields=output_data,agent_logs`. Pass the
+    X-Next-Cursor response header back as `cursor` to get the next page
+    (400 if that execution has since been deleted).
     """
-    executions = db.query(WorkflowExecution).filter(
+    fields = parse_fields(fields)
+    query = summary_query(db.query(WorkflowExecution), fields).filter(
         WorkflowExecution.workflow_id == workflow_id
-    ).offset(skip).limit(limit).all()
+    )
+    executions, next_cursor = keyset_page(query, cursor, limit)
     
-    return executions
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+    return [project(execution, fields) for execution in executions]
+
 
+@router.get("/{workflow_id}/timings", response_model=WorkflowTimingsResponse)
+def get_workflow_timings(
+    workflow_id: int,
+    limit: int = 500,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Per-stage execution timings aggregated over the most recent executions
+    """
+    rows = db.query(WorkflowExecution.timings).filter(
+        WorkflowExecution.workflow_id == workflow_id,
+        WorkflowExecution.timings.isnot(None)
+    ).order_by(WorkflowExecution.id.desc()).limit(limit).all()
+    
+    return {
+        "workflow_id": workflow_id,
+        "executions": len(rows),
+        "stages": summarize_timings(row.timings for row in rows)
+    }
+
+
+@router.get("/{workflow_id}/usage", response_model=WorkflowUsageResponse)
+def get_workflow_usage(
+    workflow_id: int,
+    days: int = 30,
+    db: Session = Depends(get_read_db)
+):
+    """
+    LLM token usage and cost of a workflow's executions, per day
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    day = func.date(WorkflowExecution.started_at)
+    
+    rows = db.query(
+        day.label("day"),
+        func.count(WorkflowExecution.id).label("executions"),
+        func.coalesce(func.sum(WorkflowExecution.llm_calls), 0).label("llm_calls"),
+        func.coalesce(func.sum(WorkflowExecution.prompt_tokens), 0).label("prompt_tokens"),
+        func.coalesce(func.sum(WorkflowExecution.completion_tokens), 0).label("completion_tokens"),
+        func.coalesce(func.sum(WorkflowExecution.total_tokens), 0).label("total_tokens"),
+        func.coalesce(func.sum(WorkflowExecution.cost_usd), 0.0).label("cost_usd")
+    ).filter(
+        WorkflowExecution.workflow_id == workflow_id,
+        WorkflowExecution.started_at >= since
+    ).group_by(day).order_by(day).all()
+    
+    buckets = [dict(row._mapping) for row in rows]
+    return {
+        "workflow_id": workflow_id,
+        "total_tokens": sum(bucket["total_tokens"] for bucket in buckets),
+        "cost_usd": sum(bucket["cost_usd"] for bucket in buckets),
+        "days": buckets
+    }
@@ -0,0 +1,189 @@
+"""
+Admission Control
+Sheds requests with 429 and a computed Retry-After while an endpoint class is over its load limit
+"""
+import asyncio
+import math
+import time
+from typing import Any, Callable, Dict
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import ADMISSION_LOAD, ADMISSION_SHED
+from app.core.scheduler import execution_scheduler
+from app.models.workflow import WorkflowExecution
+
+# Weight of the latest observation in the service time moving average
+_EWMA_ALPHA = 0.2
+
+
+class AdmissionGate:
+    """
+    Admits the requests of one endpoint class while its load is under
+    its ADMISSION_LIMITS entry (absent or 0 admits everything)
+
+    Retry-After is the time the excess load needs to drain by Little's
+    law: excess × mean service time / parallelism, clamped to
+    1..ADMISSION_MAX_RETRY_AFTER_SECONDS. While `closed` returns True
+    (e.g. during shutdown) every request gets 503 instead.
+    """
+
+    def __init__(
+        self,
+        endpoint_class: str,
+        load: Callable[[], int],
+        service_seconds: Callable[[], float],
+        parallelism: Callable[[], int],
+        closed: Callable[[], bool] = lambda: False
+    ):
+        self.endpoint_class = endpoint_class
+        self._closed = closed
+        self._load = load
+        self._service_seconds = service_seconds
+        self._parallelism = parallelism
+        self.shed = 0
+        ADMISSION_LOAD.labels(endpoint_class).set_function(load)
+
+    @property
+    def limit(self) -> int:
+        return settings.ADMISSION_LIMITS.get(self.endpoint_class, 0)
+
+    def retry_after(self, excess: int) -> int:
+        seconds = excess * (self._service_seconds() or 1.0) / max(self._parallelism(), 1)
+        return min(max(math.ceil(seconds), 1), settings.ADMISSION_MAX_RETRY_AFTER_SECONDS)
+
+    def admit(self, count: int = 1):
+        """
+        Admit a request adding `count` to the load (e.g. the inputs of a bulk request)
+
+        Raises:
+            HTTPException: 429 with Retry-After when the load plus count
+                would exceed the limit, 413 when count alone does, 503
+                when the class is closed
+        """
+        if self._closed():
+            ADMISSION_SHED.labels(self.endpoint_class).inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Shutting down, retry on another instance",
+                headers={"Retry-After": "1"}
+            )
+        limit = self.limit
+        if not limit:
+            return
+        if count > limit:
+            # Would never fit, however long the client waits
+            self.shed += 1
+            ADMISSION_SHED.labels(self.endpoint_class).inc()
+            raise HTTPException(
+                status_code=413,
+                detail=f"{count} {self.endpoint_class} exceed the limit of {limit}, split the request"
+            )
+        load = self._load()
+        if load + count <= limit:
+            return
+        self.shed += 1
+        ADMISSION_SHED.labels(self.endpoint_class).inc()
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many {self.endpoint_class} requests in progress, retry later",
+            headers={"Retry-After": str(self.retry_after(load + count - limit))}
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {"load": self._load(), "limit": self.limit, "shed": self.shed}
+
+
+class InFlightGate(AdmissionGate):
+    """Admission gate whose load is the requests it admitted that have not finished yet"""
+
+    def __init__(self, endpoint_class: str):
+        self.in_flight = 0
+        self.mean_seconds = 0.0
+        super().__init__(
+            endpoint_class,
+            load=lambda: self.in_flight,
+            service_seconds=lambda: self.mean_seconds,
+            parallelism=lambda: self.limit
+        )
+
+    async def hold(self):
+        """Dependency admitting a request and counting it in flight until it finishes"""
+        self.admit()
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            elapsed = time.perf_counter() - start
+            self.mean_seconds = elapsed if not self.mean_seconds else (
+                _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * self.mean_seconds
+            )
+
+
+class DatabaseLoad:
+    """
+    Pending plus running executions counted in the database
+
+    With EXECUTION_DISPATCH=database executions wait in the table for any
+    instance to claim them, so the local scheduler only sees the few it
+    claimed. The count is refreshed by database_load_loop in a worker
+    thread; reading it never touches the database, so a slow database
+    cannot stall admission on the event loop.
+    """
+
+    def __init__(self):
+        self._count = 0
+
+    def __call__(self) -> int:
+        return self._count
+
+    def refresh(self):
+        """Count pending and running executions (blocking)"""
+        with SessionLocal() as db:
+            self._count = db.scalar(
+                select(func.count())
+                .select_from(WorkflowExecution)
+                .where(WorkflowExecution.status.in_(("pending", "running")))
+            )
+
+
+_database_load = DatabaseLoad()
+
+
+async def database_load_loop():
+    """Refresh the database load every ADMISSION_DB_LOAD_REFRESH_SECONDS until cancelled"""
+    while True:
+        try:
+            await asyncio.to_thread(_database_load.refresh)
+        except Exception as e:
+            # Keep admitting on the last known count rather than failing requests
+            print(f"⚠️ Could not count pending executions: {e}")
+        await asyncio.sleep(settings.ADMISSION_DB_LOAD_REFRESH_SECONDS)
+
+
+def _executions_load() -> int:
+    if settings.EXECUTION_DISPATCH == "database":
+        return _database_load()
+    return execution_scheduler.load()
+
+
+# Execution creation: executions queued plus running, in the scheduler or with
+# EXECUTION_DISPATCH=database in the database; closed while the scheduler drains
+executions_gate = AdmissionGate(
+    "executions",
+    load=_executions_load,
+    service_seconds=lambda: execution_scheduler.mean_run_seconds,
+    parallelism=lambda: settings.EXECUTION_CONCURRENCY,
+    closed=lambda: execution_scheduler.draining
+)
+
+# Synchronous use-case endpoints: requests being processed
+use_cases_gate = InFlightGate("use_cases")
+
+
+def admission_status() -> Dict[str, Dict[str, Any]]:
+    """Load, limit and shed count per endpoint class"""
+    return {gate.endpoint_class: gate.status() for gate in (executions_gate, use_cases_gate)}
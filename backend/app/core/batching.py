@@ -0,0 +1,102 @@
+"""
+Micro-batching
+Coalesces items submitted for the same key within a short window into one batch call
+"""
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from app.core.config import settings
+from app.core.metrics import EXECUTION_BATCH_SIZE
+from app.core.workflow_cache import WorkflowDefinition
+
+
+def batching_options(workflow: WorkflowDefinition) -> Dict[str, int]:
+    """
+    Micro-batching window of a workflow: Workflow.config["batching"]
+    window_ms and max_items, defaulting to EXECUTION_BATCH_WINDOW_MS and
+    EXECUTION_BATCH_MAX_ITEMS (a window of 0 disables batching)
+    """
+    options = (workflow.config or {}).get("batching") or {}
+    return {
+        "window_ms": int(options.get("window_ms", settings.EXECUTION_BATCH_WINDOW_MS) or 0),
+        "max_items": int(options.get("max_items", settings.EXECUTION_BATCH_MAX_ITEMS) or 1),
+    }
+
+
+@dataclass
+class _Batch:
+    """Items collected for one key, each with the future its submitter awaits"""
+    process: Callable[[List[Any]], List[Any]]
+    items: List[Any] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    """
+    Collects items per key for up to window_ms or max_items, whichever
+    comes first, then runs `process` once on all of them in a worker
+    thread and hands each submitter its own result
+
+    `process` takes the list of items and returns one result per item,
+    in order. If it raises, every submitter of the batch gets the error.
+    It runs in a fresh context, so the deadline, usage log and trace
+    span of whichever execution opened the batch don't leak into it.
+    A submitter that is cancelled while waiting only gives up its own
+    result.
+    """
+
+    def __init__(self):
+        self._batches: Dict[Hashable, _Batch] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(
+        self,
+        key: Hashable,
+        item: Any,
+        process: Callable[[List[Any]], List[Any]],
+        window_ms: int,
+        max_items: int
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Batches opened on a previous event loop will never be flushed
+            self._batches = {}
+            self._loop = loop
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(process)
+            batch.timer = loop.call_later(window_ms / 1000, self._flush, key)
+        future = loop.create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= max_items:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: Hashable):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        EXECUTION_BATCH_SIZE.observe(len(batch.items))
+        self._loop.create_task(self._run(batch), context=contextvars.Context())
+
+    async def _run(self, batch: _Batch):
+        try:
+            results = await asyncio.to_thread(batch.process, batch.items)
+            if len(results) != len(batch.items):
+                raise ValueError(f"Batch of {len(batch.items)} items returned {len(results)} results")
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(batch.futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+# Shared by all executions of the process
+micro_batcher = MicroBatcher()
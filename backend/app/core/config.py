@@ -2,7 +2,7 @@
 Application Configuration
 Loads settings from environment variables
 """
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import validator
 
@@ -27,16 +27,34 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: str = ""  # Read replica(s) for read-only endpoints, comma-separated
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0  # Replicas further behind are excluded from reads
+    DATABASE_REPLICA_CHECK_SECONDS: int = 10
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Workflow definition cache
+    WORKFLOW_CACHE_TTL_SECONDS: int = 60  # 0 disables caching
+    WORKFLOW_CACHE_REDIS: bool = False  # Broadcast invalidations to other processes via Redis pub/sub
+    
+    # Execution event streams (GET /api/executions/{id}/events)
+    EXECUTION_EVENTS_REDIS: bool = False  # Fan events out via Redis pub/sub so any instance can serve any watcher
+    EXECUTION_EVENTS_BUFFER: int = 100  # Events queued per watcher; a slow watcher loses the oldest
+    EXECUTION_EVENTS_KEEPALIVE_SECONDS: int = 15
+    
     # OpenAI (Optional - using Groq instead)
     OPENAI_API_KEY: str = ""
     
     # Groq (Free LLM API)
     GROQ_API_KEY: str
     
+    # LLM pricing in USD per 1M tokens as [input, output], used for cost accounting
+    LLM_PRICING: Dict[str, List[float]] = {
+        "llama-3.3-70b-versatile": [0.59, 0.79],
+        "gpt-3.5-turbo": [0.50, 1.50],
+    }
+    
     # n8n Integration
     N8N_API_URL: str = ""
     N8N_API_KEY: str = ""
@@ -52,6 +70,80 @@ class Settings(BaseSettings):
     CLEARBIT_API_KEY: str = ""
     APOLLO_API_KEY: str = ""
     
+    # Execution payload storage
+    PAYLOAD_OFFLOAD_THRESHOLD: int = 16384  # Bytes of JSON above which payloads move to execution_blobs (0 disables)
+    PAYLOAD_CODEC: str = "zlib"  # zlib, zstd (requires zstandard)
+    
+    # Retention, off unless configured (per-workflow overrides in Workflow.config["retention"]; 0 days keeps forever)
+    RETENTION_PAYLOAD_DAYS: int = 0  # Keep input/output payloads and agent task details, e.g. 30
+    RETENTION_SUMMARY_DAYS: int = 0  # Keep execution rows, then archive and delete them, e.g. 365
+    RETENTION_INTERVAL_MINUTES: int = 0  # 0 disables the background job, e.g. 60
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_BATCH_PAUSE_MS: int = 50  # Pause between batches to leave room for regular traffic
+    RETENTION_BLOB_GRACE_MINUTES: int = 60  # Unreferenced blobs used more recently are kept; longer than any transaction
+    RETENTION_ARCHIVE_DIR: str = ""  # Absolute path on persistent storage; required before anything is archived and removed
+    RETENTION_ARCHIVE_CODEC: str = "gzip"  # gzip, zstd (requires zstandard)
+    
+    # Execution status writes (transitions are coalesced and committed in batches)
+    STATUS_FLUSH_INTERVAL_MS: int = 20
+    STATUS_BATCH_SIZE: int = 500
+    
+    # Execution scheduling (per-workflow priority, weight and max_concurrency in Workflow.config["scheduling"])
+    EXECUTION_CONCURRENCY: int = 16  # Executions running at once per process
+    EXECUTION_PRIORITY_WEIGHTS: Dict[str, float] = {"interactive": 8.0, "webhook": 4.0, "bulk": 1.0}
+    EXECUTION_TYPE_CONCURRENCY: Dict[str, int] = {}  # Max concurrent executions per workflow_type, e.g. {"email_processing": 4}
+    
+    # Micro-batching: concurrent executions of one workflow are coalesced into one LLM request for up to
+    # EXECUTION_BATCH_WINDOW_MS or EXECUTION_BATCH_MAX_ITEMS (per-workflow window_ms and max_items in
+    # Workflow.config["batching"]; a window of 0 disables it). Only lead_qualification supports batching.
+    EXECUTION_BATCH_WINDOW_MS: int = 0
+    EXECUTION_BATCH_MAX_ITEMS: int = 16
+    
+    # Execution deadlines (per-workflow timeout_seconds in Workflow.config["scheduling"])
+    EXECUTION_TIMEOUT_SECONDS: int = 300
+    EXECUTION_REAPER_INTERVAL_SECONDS: int = 60  # 0 disables failing executions orphaned by a stopped worker
+    EXECUTION_REAPER_GRACE_SECONDS: int = 60  # Time past its deadline before a running execution counts as orphaned
+    
+    # Graceful shutdown: running executions get this long to finish, then are checkpointed and requeued
+    SHUTDOWN_GRACE_SECONDS: int = 30
+    EXECUTION_REQUEUE_POLL_SECONDS: int = 5  # How often requeued executions are picked up (0 disables)
+    
+    # Execution dispatch: "local" runs executions on the instance that created them,
+    # "database" leaves them pending for any instance to claim (multi-node deployments)
+    EXECUTION_DISPATCH: str = "local"
+    EXECUTION_CLAIM_BATCH: int = 32  # Most executions claimed per round trip
+    EXECUTION_CLAIM_POLL_MS: int = 500  # How often an idle instance looks for pending executions
+    EXECUTION_LEASE_SECONDS: int = 30  # Claims not renewed for this long pass to other instances
+    
+    # Admission control: requests get 429 once an endpoint class is at its limit (0 disables)
+    # executions = executions queued or running, use_cases = use-case requests in progress
+    ADMISSION_LIMITS: Dict[str, int] = {"executions": 10000, "use_cases": 32}
+    ADMISSION_MAX_RETRY_AFTER_SECONDS: int = 60
+    ADMISSION_DB_LOAD_REFRESH_SECONDS: float = 1.0  # How often the pending/running count of EXECUTION_DISPATCH=database is refreshed
+    
+    # Bulk execution creation
+    BULK_MAX_EXECUTIONS: int = 100000  # Inputs accepted per request
+    BULK_CHUNK_SIZE: int = 1000  # Rows per multi-row INSERT
+    
+    # Request deduplication (Idempotency-Key header, or identical inputs within the window)
+    IDEMPOTENCY_WINDOW_SECONDS: int = 300  # 0 disables input-hash dedup; keys always apply
+    IDEMPOTENCY_MAX_RESULTS: int = 10000  # Use-case results remembered per process
+    
+    # Admin (empty disables admin endpoints and on-demand profiling)
+    ADMIN_TOKEN: str = ""
+    
+    # Profiling
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of requests profiled automatically
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_MAX_STORED: int = 50
+    
+    # Tracing
+    TRACING_EXPORTER: str = "none"  # none, console, file, otlp
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = ""
+    TRACING_SERVICE_NAME: str = "flowmancer-backend"
+    
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
     
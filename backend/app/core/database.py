@@ -1,10 +1,21 @@
 """
 Database Configuration and Session Management
 """
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core.etags import etag_subjects
+from app.core.metrics import DB_REPLICA_HEALTHY, DB_REPLICA_LAG, instrument_engine
+from app.core.schema import upgrade_schema
 
 # Create database engine
 engine = create_engine(
@@ -12,6 +23,7 @@ engine = create_engine(
     pool_pre_ping=True,
     echo=settings.DEBUG
 )
+instrument_engine(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -19,6 +31,118 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for models
 Base = declarative_base()
 
+# Seconds of replay delay on a Postgres standby (0 when caught up or not a standby)
+_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    """A read replica with the outcome of its last health check"""
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.lag_seconds: Optional[float] = None
+        self.healthy = False  # Only used once a check has passed
+        self.error: Optional[str] = None
+
+    def check(self):
+        """Measure replication lag; unreachable or lagging replicas are excluded"""
+        try:
+            with self.engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    self.lag_seconds = float(connection.execute(_REPLICA_LAG_SQL).scalar() or 0)
+                else:
+                    connection.execute(text("SELECT 1"))
+                    self.lag_seconds = 0.0
+            self.error = None
+            self.healthy = self.lag_seconds <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+        except Exception as e:
+            self.lag_seconds = None
+            self.error = str(e)
+            self.healthy = False
+
+        DB_REPLICA_HEALTHY.labels(self.name).set(int(self.healthy))
+        if self.lag_seconds is not None:
+            DB_REPLICA_LAG.labels(self.name).set(self.lag_seconds)
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for read-only sessions
+
+    Reads go round-robin to the replicas that passed their last health
+    check and to the primary when none did. Keys written by this process
+    within the replication window are remembered so that reads of them
+    stay on the primary (read-your-writes).
+    """
+
+    # Most recently written keys remembered at once
+    MAX_TRACKED_WRITES = 10000
+
+    def __init__(self, urls: List[str]):
+        self.replicas: List[Replica] = []
+        for index, url in enumerate(urls):
+            replica_engine = create_engine(url, pool_pre_ping=True, echo=settings.DEBUG)
+            instrument_engine(replica_engine)
+            self.replicas.append(Replica(replica_engine.url.host or f"replica{index}", replica_engine))
+        self._next = itertools.count()
+        self._writes: "OrderedDict[Any, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_engine(self) -> Engine:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return engine
+        return healthy[next(self._next) % len(healthy)].engine
+
+    def mark_written(self, name: str, value: Any):
+        """
+        Route reads of `name=value` (e.g. execution_id=42) to the primary
+        for a while, and revalidations of lists of `name` (value "*")
+        """
+        if not self.replicas:
+            return
+        window = settings.DATABASE_REPLICA_MAX_LAG_SECONDS + settings.DATABASE_REPLICA_CHECK_SECONDS
+        now = time.monotonic()
+        with self._lock:
+            for key in ((name, str(value)), (name, "*")):
+                self._writes[key] = now + window
+                self._writes.move_to_end(key)
+            while self._writes and (
+                len(self._writes) > self.MAX_TRACKED_WRITES or next(iter(self._writes.values())) < now
+            ):
+                self._writes.popitem(last=False)
+
+    def written_recently(self, name: str, value: Any) -> bool:
+        with self._lock:
+            expires = self._writes.get((name, str(value)))
+        return expires is not None and expires > time.monotonic()
+
+    def check(self):
+        """Run the health check of every replica"""
+        for replica in self.replicas:
+            replica.check()
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag_seconds,
+                "error": replica.error,
+            }
+            for replica in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter([url.strip() for url in settings.DATABASE_REPLICA_URL.split(",") if url.strip()])
+
 
 def get_db():
     """
@@ -32,9 +156,52 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request):
+    """
+    Dependency function for read-only endpoints
+    
+    Yields a session on a healthy read replica, or on the primary when
+    no replica is usable or when a path or query parameter of the
+    request (such as execution_id or ?workflow_id=) names something this
+    process wrote within the replication window. So do the ETags of an
+    If-None-Match header, so that a replica behind on the write cannot
+    answer a revalidation with a stale 304.
+    """
+    subjects = [
+        *request.path_params.items(),
+        *request.query_params.multi_items(),
+        *etag_subjects(request.headers.get("if-none-match")),
+    ]
+    bind = engine
+    if not any(replica_router.written_recently(name, value) for name, value in subjects):
+        bind = replica_router.read_engine()
+
+    db = SessionLocal(bind=bind)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def is_replica_session(db: Session) -> bool:
+    """Whether a session reads from a replica rather than the primary"""
+    return db.get_bind() is not engine
+
+
+async def replica_health_loop():
+    """Re-check replicas every DATABASE_REPLICA_CHECK_SECONDS until cancelled"""
+    while True:
+        await asyncio.sleep(settings.DATABASE_REPLICA_CHECK_SECONDS)
+        await asyncio.to_thread(replica_router.check)
+
+
 def init_db():
     """
-    Initialize database - create all tables
+    Initialize database - create missing tables and add the columns and
+    indexes that tables of earlier versions lack
     """
     Base.metadata.create_all(bind=engine)
-
+    with engine.begin() as connection:
+        for statement in upgrade_schema(connection, Base.metadata):
+            print(f"🛠️ Schema upgrade: {statement}")
+    replica_router.check()
@@ -0,0 +1,161 @@
+"""
+Execution Deadlines
+Per-execution time limits and cooperative cancellation, checked by the runner and inside agent worker threads,
+and the reaper failing executions whose worker stopped
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Optional, TypeVar
+from sqlalchemy import func, or_, update
+from app.core.config import settings
+from app.core.database import SessionLocal, replica_router
+from app.core.events import execution_events
+from app.core.stats import record_executions_stats
+from app.core.workflow_cache import WorkflowDefinition
+from app.models import WorkflowExecution
+
+T = TypeVar("T")
+
+
+class ExecutionTimeout(Exception):
+    """An execution ran past its deadline"""
+
+
+class ExecutionCancelled(Exception):
+    """An execution was cancelled while one of its steps was running"""
+
+
+def execution_timeout(workflow: WorkflowDefinition) -> float:
+    """Seconds an execution of the workflow may run: Workflow.config["scheduling"]["timeout_seconds"] or EXECUTION_TIMEOUT_SECONDS"""
+    scheduling = (workflow.config or {}).get("scheduling") or {}
+    return float(scheduling.get("timeout_seconds") or settings.EXECUTION_TIMEOUT_SECONDS)
+
+
+class Deadline:
+    """
+    Time limit and cancellation flag of one running execution
+
+    The runner awaits each step through run(), which stops waiting once
+    the deadline passes. Blocking steps in worker threads can't be
+    interrupted, so agent code calls check_deadline() between LLM calls
+    and crew tasks to give up at the next boundary.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.cancelled = False
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def check(self):
+        """
+        Raises:
+            ExecutionCancelled: The execution was cancelled
+            ExecutionTimeout: The deadline has passed
+        """
+        if self.cancelled:
+            raise ExecutionCancelled("Execution was cancelled")
+        if self.remaining() <= 0:
+            raise ExecutionTimeout(f"Execution exceeded its {self.seconds:g}s deadline")
+
+    async def run(self, step: Awaitable[T]) -> T:
+        """Await a step of the execution for at most the remaining time"""
+        try:
+            self.check()
+            return await asyncio.wait_for(step, self.remaining())
+        except asyncio.TimeoutError:
+            raise ExecutionTimeout(f"Execution exceeded its {self.seconds:g}s deadline")
+        finally:
+            if asyncio.iscoroutine(step):
+                step.close()  # Never started when check() raised
+
+
+# Deadline of the execution running in the current context (copied into worker threads)
+_current: ContextVar[Optional[Deadline]] = ContextVar("execution_deadline", default=None)
+
+
+@contextmanager
+def enforce(deadline: Deadline):
+    """Make a deadline visible to check_deadline() inside the block and the threads it starts"""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def check_deadline():
+    """Raise if the current execution was cancelled or is past its deadline (no-op outside executions)"""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+_ABANDONED = "Execution abandoned: its worker stopped before finishing"
+
+
+def reap_orphaned_executions() -> int:
+    """
+    Fail executions left "running" by a worker that crashed or was killed
+
+    A live runner gives up at the deadline_at it recorded when it
+    started, so a row still running EXECUTION_REAPER_GRACE_SECONDS
+    later has nobody left to finish it. The status check is part of the
+    UPDATE, so a run finishing meanwhile is not overwritten. Blocking,
+    so call it from a worker thread.
+
+    Returns:
+        Number of executions failed
+    """
+    table = WorkflowExecution.__table__
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.EXECUTION_REAPER_GRACE_SECONDS)
+    with SessionLocal() as db:
+        reaped = db.execute(
+            update(table)
+            .where(
+                table.c.status == "running",
+                table.c.deadline_at < cutoff,
+                # A live lease means its worker is still heartbeating
+                or_(table.c.lease_expires_at.is_(None), table.c.lease_expires_at < func.now())
+            )
+            .values(
+                status="failed",
+                error_message=_ABANDONED,
+                completed_at=func.now()
+            )
+            .returning(
+                table.c.id,
+                table.c.workflow_id,
+                table.c.status,
+                table.c.duration_ms,
+                table.c.llm_calls,
+                table.c.prompt_tokens,
+                table.c.completion_tokens,
+                table.c.total_tokens,
+                table.c.cost_usd
+            )
+        ).all()
+        record_executions_stats(db, reaped)
+        db.commit()
+
+    for row in reaped:
+        replica_router.mark_written("execution_id", row.id)
+        execution_events.publish(row.id, "status", {"status": "failed", "error_message": _ABANDONED})
+    return len(reaped)
+
+
+async def reaper_loop():
+    """Reap orphaned executions every EXECUTION_REAPER_INTERVAL_SECONDS until cancelled"""
+    while True:
+        await asyncio.sleep(settings.EXECUTION_REAPER_INTERVAL_SECONDS)
+        try:
+            reaped = await asyncio.to_thread(reap_orphaned_executions)
+            if reaped:
+                print(f"🧹 Failed {reaped} orphaned execution(s)")
+        except Exception as e:
+            print(f"⚠️ Execution reaper run failed: {e}")
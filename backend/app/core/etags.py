@@ -0,0 +1,53 @@
+"""
+Conditional Requests
+Weak ETags from row version counters and If-None-Match handling for 304 Not Modified
+"""
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+from fastapi import Response
+
+
+def weak_etag(*parts: object) -> str:
+    """Weak ETag identifying a representation by the given parts, e.g. kind, id and version"""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def list_etag(kind: str, rows: Iterable[Tuple[int, int]]) -> str:
+    """Weak ETag of a list from the (id, version) of its items, in order"""
+    digest = hashlib.sha1(",".join(f"{id_}:{version}" for id_, version in rows).encode()).hexdigest()
+    return weak_etag(kind, digest[:20])
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag, using the weak
+    comparison HTTP prescribes for it (W/ prefixes are ignored)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def etag_subjects(if_none_match: Optional[str]) -> List[Tuple[str, str]]:
+    """
+    What the ETags of an If-None-Match header were made from, as
+    (name, value) pairs in the terms of ReplicaRouter.mark_written:
+    W/"execution-42-3" gives ("execution_id", "42") and a list ETag
+    such as W/"workflows-<digest>" gives ("workflow_id", "*")
+    """
+    subjects = []
+    for candidate in (if_none_match or "").split(","):
+        parts = candidate.strip().removeprefix("W/").strip('"').split("-")
+        if len(parts) == 3 and parts[1].isdigit():
+            subjects.append((f"{parts[0]}_id", parts[1]))
+        elif len(parts) == 2 and parts[0].endswith("s"):
+            subjects.append((f"{parts[0][:-1]}_id", "*"))
+    return subjects
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a representation the client already has"""
+    return Response(status_code=304, headers={"ETag": etag})
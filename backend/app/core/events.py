@@ -0,0 +1,151 @@
+"""
+Execution Events
+In-process pub/sub of execution status transitions and agent progress for streaming watchers, optionally fanned out over Redis
+"""
+import asyncio
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Set
+from app.core.config import settings
+from app.core.metrics import EXECUTION_EVENT_SUBSCRIBERS
+
+
+EVENTS_CHANNEL = "flowmancer:execution-events"
+
+
+class ExecutionEventBus:
+    """
+    Delivers events of an execution to the watchers subscribed to it
+
+    Each watcher has a queue of at most EXECUTION_EVENTS_BUFFER events;
+    a watcher that falls behind loses the oldest ones. With
+    EXECUTION_EVENTS_REDIS, events are published to Redis and every
+    process (this one included) delivers them from its
+    execution_event_listener, so a watcher connected to any instance
+    sees executions running on all of them.
+
+    publish() may be called from worker threads; delivery always
+    happens on the event loop.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis: Any = None
+        self._redis_tasks: Set[asyncio.Task] = set()
+        EXECUTION_EVENT_SUBSCRIBERS.set_function(self.subscriber_count)
+
+    def _bind(self, loop: asyncio.AbstractEventLoop):
+        if self._loop is not loop:
+            # Watchers and clients of a previous event loop can no longer be served
+            self._subscribers = {}
+            self._redis = None
+            self._loop = loop
+
+    def subscribe(self, execution_id: int) -> asyncio.Queue:
+        """Start receiving the events of an execution; pair with unsubscribe()"""
+        self._bind(asyncio.get_running_loop())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EXECUTION_EVENTS_BUFFER)
+        self._subscribers.setdefault(execution_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, execution_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(execution_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[execution_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, execution_id: int, event: str, data: Dict[str, Any]):
+        """Publish an event ("status" or "progress") of an execution"""
+        message = {"execution_id": execution_id, "event": event, "data": data}
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Worker thread: hand over to the event loop
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._publish, message)
+            return
+        self._bind(loop)
+        self._publish(message)
+
+    def _publish(self, message: Dict[str, Any]):
+        if not settings.EXECUTION_EVENTS_REDIS:
+            self.deliver(message)
+            return
+        task = self._loop.create_task(self._publish_redis(message))
+        self._redis_tasks.add(task)
+        task.add_done_callback(self._redis_tasks.discard)
+
+    async def _publish_redis(self, message: Dict[str, Any]):
+        try:
+            if self._redis is None:
+                import redis.asyncio as redis
+                self._redis = redis.Redis.from_url(settings.REDIS_URL)
+            await self._redis.publish(EVENTS_CHANNEL, json.dumps(message, default=str))
+        except Exception as e:
+            print(f"⚠️ Could not publish event of execution {message['execution_id']}: {e}")
+
+    def deliver(self, message: Dict[str, Any]):
+        """Put an event in the queues of this process's watchers of its execution"""
+        for queue in self._subscribers.get(message["execution_id"], ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+
+async def execution_event_listener():
+    """
+    Deliver execution events published over Redis to this process's
+    watchers until cancelled (EXECUTION_EVENTS_REDIS)
+
+    Reconnects after Redis errors; events published meanwhile are lost,
+    which watchers notice as a gap before the next status.
+    """
+    import redis.asyncio as redis
+
+    while True:
+        client = redis.Redis.from_url(settings.REDIS_URL)
+        try:
+            pubsub = client.pubsub()
+            await pubsub.subscribe(EVENTS_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    execution_events.deliver(json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Execution event listener failed, retrying: {e}")
+            await asyncio.sleep(5)
+        finally:
+            await client.aclose()
+
+
+# Execution whose agents report progress in the current context (copied into worker threads)
+_progress_execution: ContextVar[Optional[int]] = ContextVar("progress_execution", default=None)
+
+
+@contextmanager
+def track_progress(execution_id: int):
+    """Publish the progress reported inside the block, and the threads it starts, as events of an execution"""
+    token = _progress_execution.set(execution_id)
+    try:
+        yield
+    finally:
+        _progress_execution.reset(token)
+
+
+def report_progress(kind: str, **data: Any):
+    """Publish a progress event of the current execution (no-op outside executions)"""
+    execution_id = _progress_execution.get()
+    if execution_id is not None:
+        execution_events.publish(execution_id, "progress", {"kind": kind, **data})
+
+
+# Shared by all requests and executions of the process
+execution_events = ExecutionEventBus()
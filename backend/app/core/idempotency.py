@@ -0,0 +1,109 @@
+"""
+Request Deduplication
+Idempotency keys, input hashing and in-flight sharing of identical work
+"""
+import asyncio
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+from app.core.config import settings
+from app.core.payloads import encode_payload
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+T = TypeVar("T")
+
+
+def input_hash(value: Any) -> str:
+    """SHA-256 of an input's canonical JSON, equal for equal inputs regardless of key order"""
+    return hashlib.sha256(encode_payload(value)).hexdigest()
+
+
+class SingleFlight:
+    """
+    Lets concurrent calls with the same key share one computation
+
+    The first caller runs it; callers arriving while it is in flight
+    wait for and receive the same result (or error). Nothing is kept
+    once it finishes. Each flight records the hash of the input it is
+    computing, for callers to check before attaching to it.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Tuple[asyncio.Future, Optional[str]]] = {}
+
+    def digest(self, key: Hashable) -> Optional[str]:
+        """Input hash of the computation in flight for a key, if any"""
+        flight = self._flights.get(key)
+        return flight[1] if flight is not None else None
+
+    async def run(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[T]],
+        digest: Optional[str] = None
+    ) -> Tuple[T, bool]:
+        """
+        Returns:
+            The result and whether it was shared from another caller's computation
+        """
+        if key in self._flights:
+            return await asyncio.shield(self._flights[key][0]), True
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = (flight, digest)
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            flight.exception()  # Retrieved here, so no warning when nobody else was waiting
+            raise
+        else:
+            flight.set_result(result)
+            return result, False
+        finally:
+            del self._flights[key]
+
+
+class RecentResults:
+    """
+    Results of completed calls kept for IDEMPOTENCY_WINDOW_SECONDS
+
+    Each entry remembers the hash of the input it was computed from, so
+    an idempotency key reused with a different input can be rejected.
+    Entries stored under an idempotency key are kept even when the
+    window is 0, until evicted. Bounded to IDEMPOTENCY_MAX_RESULTS
+    entries, oldest first out.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[Hashable, Tuple[float, str, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Tuple[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, digest, result = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        return digest, result
+
+    def put(self, key: Hashable, digest: str, result: Any, keyed: bool = False):
+        if settings.IDEMPOTENCY_WINDOW_SECONDS > 0:
+            expires = time.monotonic() + settings.IDEMPOTENCY_WINDOW_SECONDS
+        elif keyed:
+            expires = math.inf
+        else:
+            return
+        self._entries[key] = (expires, digest, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.IDEMPOTENCY_MAX_RESULTS:
+            self._entries.popitem(last=False)
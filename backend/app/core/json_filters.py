@@ -0,0 +1,109 @@
+"""
+JSON Payload Filters
+Turns `column.key.path op value` conditions into SQL that uses the JSON indexes of each dialect
+"""
+import json
+import operator
+import re
+from typing import Any, List, Tuple
+from fastapi import HTTPException
+from sqlalchemy import func, literal, literal_column, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import ColumnElement
+from app.models import WorkflowExecution
+
+
+_CONDITION = re.compile(r"^(input_data|output_data)((?:\.\w+)+)\s*(==|!=|>=|<=|=|>|<)\s*(.+)$")
+
+OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+# jsonb_typeof() names of filter values, so ranges only compare like with like
+_JSONB_TYPES = {bool: "boolean", int: "number", float: "number", str: "string"}
+
+
+def parse_condition(condition: str) -> Tuple[str, List[str], str, Any]:
+    """
+    Parse a filter such as `output_data.lead_score>=80` or `input_data.source=webinar`
+
+    Values are read as JSON when possible (numbers, true/false, null,
+    "quoted strings") and as plain strings otherwise.
+
+    Returns:
+        Column name, key path, operator and value
+
+    Raises:
+        HTTPException: 400 for malformed conditions
+    """
+    match = _CONDITION.match(condition.strip())
+    if not match:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid filter '{condition}', expected e.g. output_data.lead_score>=80"
+        )
+
+    column, path, op, raw = match.groups()
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw.strip()
+
+    if isinstance(value, (dict, list)):
+        raise HTTPException(status_code=400, detail=f"Filter values must be scalars: '{condition}'")
+    if value is None and op not in ("=", "==", "!="):
+        raise HTTPException(status_code=400, detail=f"null only supports = and !=: '{condition}'")
+
+    return column, path.lstrip(".").split("."), "=" if op == "==" else op, value
+
+
+def _postgres_clause(column: Any, path: List[str], op: str, value: Any) -> ColumnElement:
+    document = type_coerce(column, JSONB)
+
+    # Equality as containment (column @> '{"a": {"b": value}}') is served by the GIN index
+    if op == "=" and value is not None:
+        nested = value
+        for key in reversed(path):
+            nested = {key: nested}
+        return document.contains(nested)
+
+    # Spelled `column -> 'key'` with an inline key (keys are \w+ only), the exact
+    # form of expression indexes such as (output_data -> 'lead_score')
+    if len(path) == 1:
+        element = document.op("->", return_type=JSONB)(literal_column(f"'{path[0]}'"))
+    else:
+        element = document[tuple(path)]
+    if value is None:
+        return OPERATORS[op](func.jsonb_typeof(element), "null")
+
+    clause = OPERATORS[op](element, literal(value, JSONB))
+    if op in ("=", "!="):
+        return clause
+    return clause & (func.jsonb_typeof(element) == _JSONB_TYPES[type(value)])
+
+
+def json_condition(dialect: str, condition: str) -> ColumnElement:
+    """
+    SQL clause for a filter condition on an execution payload column
+
+    On Postgres this compiles to JSONB containment or comparisons of
+    `->` / `#>` expressions; elsewhere to json_extract(). On both, null
+    matches an explicit JSON null and != null any other value; a missing
+    key matches neither.
+    """
+    column_name, path, op, value = parse_condition(condition)
+    column = getattr(WorkflowExecution, column_name)
+
+    if dialect == "postgresql":
+        return _postgres_clause(column, path, op, value)
+
+    json_path = "$." + ".".join(path)
+    if value is None:
+        # json_extract() gives SQL NULL for JSON null, which `= NULL` never matches
+        return OPERATORS[op](func.json_type(column, json_path), "null")
+    return OPERATORS[op](func.json_extract(column, json_path), value)
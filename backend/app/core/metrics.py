@@ -0,0 +1,219 @@
+"""
+Prometheus Metrics
+Metric definitions and instrumentation for HTTP, LLM, execution, DB pool and integrations
+"""
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Latency buckets (seconds) sized for LLM round trips, which run far longer than HTTP handlers
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "flowmancer_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+)
+
+# LLM
+LLM_REQUEST_DURATION = Histogram(
+    "flowmancer_llm_request_duration_seconds",
+    "LLM call latency",
+    ["model", "processor"],
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "flowmancer_llm_tokens_total",
+    "LLM tokens consumed",
+    ["model", "processor", "kind"],
+)
+LLM_ERRORS = Counter(
+    "flowmancer_llm_errors_total",
+    "LLM calls that raised an error",
+    ["model", "processor"],
+)
+
+# Executions
+EXECUTIONS = Counter(
+    "flowmancer_executions_total",
+    "Finished workflow executions",
+    ["workflow_type", "status"],
+)
+EXECUTION_DURATION = Histogram(
+    "flowmancer_execution_duration_seconds",
+    "Workflow execution duration from enqueue to completion",
+    ["workflow_type", "status"],
+    buckets=LLM_BUCKETS,
+)
+EXECUTION_QUEUE_DEPTH = Gauge(
+    "flowmancer_execution_queue_depth",
+    "Executions enqueued but not yet started",
+)
+EXECUTIONS_IN_PROGRESS = Gauge(
+    "flowmancer_executions_in_progress",
+    "Executions currently running",
+)
+EXECUTION_QUEUE_WAIT = Histogram(
+    "flowmancer_execution_queue_wait_seconds",
+    "Time executions waited in the scheduler for a slot",
+    ["priority"],
+    buckets=LLM_BUCKETS,
+)
+EXECUTION_BATCH_SIZE = Histogram(
+    "flowmancer_execution_batch_size",
+    "Executions coalesced into one micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+EXECUTION_EVENT_SUBSCRIBERS = Gauge(
+    "flowmancer_execution_event_subscribers",
+    "Clients watching execution events",
+)
+
+# Admission control
+ADMISSION_SHED = Counter(
+    "flowmancer_admission_shed_total",
+    "Requests rejected with 429 because their endpoint class was at its load limit",
+    ["endpoint_class"],
+)
+ADMISSION_LOAD = Gauge(
+    "flowmancer_admission_load",
+    "Load counted against the admission limit of an endpoint class",
+    ["endpoint_class"],
+)
+
+# Database pool
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "flowmancer_db_pool_checkout_seconds",
+    "Time spent waiting for a pooled DB connection",
+    buckets=DB_BUCKETS,
+)
+DB_POOL_IN_USE = Gauge(
+    "flowmancer_db_pool_connections_in_use",
+    "DB connections currently checked out of the pool",
+)
+DB_REPLICA_LAG = Gauge(
+    "flowmancer_db_replica_lag_seconds",
+    "Replication lag measured by the last replica health check",
+    ["replica"],
+)
+DB_REPLICA_HEALTHY = Gauge(
+    "flowmancer_db_replica_healthy",
+    "Whether a read replica currently receives reads (1) or is excluded (0)",
+    ["replica"],
+)
+
+# Workflow definition cache
+WORKFLOW_CACHE_REQUESTS = Counter(
+    "flowmancer_workflow_cache_requests_total",
+    "Workflow definition lookups by cache result",
+    ["result"],
+)
+
+# Outbound integrations
+INTEGRATION_REQUEST_DURATION = Histogram(
+    "flowmancer_integration_request_duration_seconds",
+    "Outbound integration call latency",
+    ["integration", "outcome"],
+)
+
+# Retention
+RETENTION_ROWS = Counter(
+    "flowmancer_retention_rows_total",
+    "Rows processed by the retention job",
+    ["phase"],
+)
+RETENTION_BATCH_DURATION = Histogram(
+    "flowmancer_retention_batch_duration_seconds",
+    "Duration of one retention batch transaction",
+    ["phase"],
+    buckets=DB_BUCKETS,
+)
+RETENTION_LAST_SUCCESS = Gauge(
+    "flowmancer_retention_last_success_timestamp_seconds",
+    "Unix time of the last completed retention run",
+)
+
+# Execution status writes
+STATUS_TRANSITIONS = Counter(
+    "flowmancer_status_transitions_total",
+    "Execution state transitions submitted to the status writer",
+    ["kind"],
+)
+STATUS_COMMITS = Counter(
+    "flowmancer_status_commits_total",
+    "Transactions committed by the status writer",
+)
+STATUS_COMMITS_SAVED = Counter(
+    "flowmancer_status_commits_saved_total",
+    "Commits avoided by coalescing transitions (transitions minus commits)",
+)
+STATUS_FLUSH_DURATION = Histogram(
+    "flowmancer_status_flush_duration_seconds",
+    "Duration of one status writer flush transaction",
+    buckets=DB_BUCKETS,
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template
+
+    Labels use the matched route path (e.g. /api/executions/{execution_id})
+    rather than the raw URL to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            ).observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine):
+    """
+    Record pool checkout latency and in-use connections for an engine
+    """
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_IN_USE.inc()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_IN_USE.dec()
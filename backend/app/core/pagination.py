@@ -0,0 +1,64 @@
+"""
+Keyset Pagination
+Cursor-based paging over executions ordered by (started_at, id), newest first
+"""
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Query
+from app.models import WorkflowExecution
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Ranked results (search) page by offset, since their order is not a key
+NEXT_OFFSET_HEADER = "X-Next-Offset"
+
+
+def keyset_page(
+    query: Query,
+    cursor: Optional[int],
+    limit: int
+) -> Tuple[List[WorkflowExecution], Optional[int]]:
+    """
+    Fetch one page of executions after the given cursor
+
+    The cursor is the id of the last row of the previous page. Its
+    started_at is looked up by primary key inside the same statement, so
+    the comparison uses the exact stored value and every page is a single
+    index range scan regardless of depth. A cursor whose execution no
+    longer exists (e.g. removed by retention) cannot be placed, and is
+    rejected rather than answered with an empty page that looks like the
+    end of the list.
+
+    Args:
+        query: Execution query with filters applied
+        cursor: Id of the last row of the previous page, or None for the first page
+        limit: Page size
+
+    Returns:
+        The rows and the cursor for the next page (None on the last page)
+
+    Raises:
+        HTTPException: 400 if the cursor's execution does not exist
+    """
+    if cursor is not None:
+        cursor_started_at = select(WorkflowExecution.started_at).where(
+            WorkflowExecution.id == cursor
+        ).scalar_subquery()
+        query = query.filter(
+            tuple_(WorkflowExecution.started_at, WorkflowExecution.id)
+            < tuple_(cursor_started_at, cursor)
+        )
+
+    rows = query.order_by(
+        WorkflowExecution.started_at.desc(),
+        WorkflowExecution.id.desc()
+    ).limit(limit).all()
+
+    # An unknown cursor makes the comparison NULL, so it only shows up as an empty page
+    if cursor is not None and not rows and query.session.get(WorkflowExecution, cursor) is None:
+        raise HTTPException(status_code=400, detail=f"Unknown cursor {cursor}, restart from the first page")
+
+    next_cursor = rows[-1].id if len(rows) == limit else None
+    return rows, next_cursor
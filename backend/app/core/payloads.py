@@ -0,0 +1,237 @@
+"""
+Payload Storage
+Moves large execution payloads into compressed, deduplicated blobs and loads them back transparently
+"""
+import hashlib
+import json
+import zlib
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.config import settings
+from app.models import ExecutionBlob, WorkflowExecution
+
+
+# Offloadable JSON column -> column holding its blob digest
+PAYLOAD_COLUMNS = {
+    "input_data": "input_blob_digest",
+    "output_data": "output_blob_digest",
+}
+
+_OFFLOADED_KEY = "offloaded_payloads"
+
+# Longest string kept in the inline stub of an offloaded payload
+STUB_MAX_STRING = 256
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("PAYLOAD_CODEC=zstd requires the zstandard package") from e
+    return zstandard
+
+
+# Codec name -> (compress, decompress)
+CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "zstd": (
+        lambda data: _zstd().ZstdCompressor(level=3).compress(data),
+        lambda data: _zstd().ZstdDecompressor().decompress(data),
+    ),
+}
+
+
+def encode_payload(value: Any) -> bytes:
+    """Canonical JSON encoding, so equal payloads share one digest"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def payload_stub(value: Any) -> Any:
+    """
+    Inline remainder of an offloaded payload
+
+    Keeps the nested objects with their numbers, booleans and short
+    strings, so filters and JSON indexes on fields like lead_score or
+    category keep working; long text and lists live only in the blob.
+    """
+    if not isinstance(value, dict):
+        return None
+    return {
+        key: payload_stub(item) if isinstance(item, dict) else item
+        for key, item in value.items()
+        if not isinstance(item, list) and not (isinstance(item, str) and len(item) > STUB_MAX_STRING)
+    }
+
+
+def _insert_blob(connection: Connection, digest: str, raw: bytes):
+    """
+    Insert a blob, or mark the existing one with the same digest as used
+
+    Bumping last_used_at keeps the blob out of retention's garbage
+    collection until the execution referring to it has committed, which
+    the collector cannot see before then.
+    """
+    table = ExecutionBlob.__table__
+    reused = connection.execute(
+        update(table).where(table.c.digest == digest).values(last_used_at=func.now())
+    )
+    if reused.rowcount:
+        return
+
+    compress, _ = CODECS[settings.PAYLOAD_CODEC]
+    values = {
+        "digest": digest,
+        "codec": settings.PAYLOAD_CODEC,
+        "size": len(raw),
+        "data": compress(raw),
+    }
+
+    # Concurrent writers of the same payload race between the check and the insert
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(**values).on_conflict_do_update(
+            index_elements=["digest"], set_={"last_used_at": func.now()}
+        )
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(**values).on_conflict_do_update(
+            index_elements=["digest"], set_={"last_used_at": func.now()}
+        )
+    else:
+        stmt = table.insert().values(**values)
+    connection.execute(stmt)
+
+
+def store_payload(connection: Connection, value: Any) -> Optional[str]:
+    """
+    Store a payload as a blob if it is above PAYLOAD_OFFLOAD_THRESHOLD
+
+    Returns:
+        The blob digest, or None when the payload should stay inline
+    """
+    threshold = settings.PAYLOAD_OFFLOAD_THRESHOLD
+    if value is None or threshold <= 0:
+        return None
+
+    raw = encode_payload(value)
+    if len(raw) < threshold:
+        return None
+
+    digest = hashlib.sha256(raw).hexdigest()
+    _insert_blob(connection, digest, raw)
+    return digest
+
+
+def offload_payloads(connection: Connection, row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Column values for a Core INSERT/UPDATE with large payloads stored as blobs
+
+    The ORM hooks below do this on flush; bulk writes that bypass the
+    ORM call it per row. Payload columns absent from the row are left alone.
+    """
+    row = dict(row)
+    for column, digest_column in PAYLOAD_COLUMNS.items():
+        if column in row:
+            digest = store_payload(connection, row[column])
+            row[digest_column] = digest
+            if digest is not None:
+                row[column] = payload_stub(row[column])
+    return row
+
+
+def load_payloads(connection: Connection, digests: Iterable[str]) -> Dict[str, bytes]:
+    """Fetch and decompress blobs by digest, returning their raw JSON"""
+    digests = set(digests)
+    if not digests:
+        return {}
+
+    table = ExecutionBlob.__table__
+    rows = connection.execute(
+        select(table.c.digest, table.c.codec, table.c.data).where(table.c.digest.in_(digests))
+    ).all()
+    return {row.digest: CODECS[row.codec][1](row.data) for row in rows}
+
+
+def hydrate_payloads(session: Session, executions: Iterable[WorkflowExecution]):
+    """
+    Load offloaded payloads of the given executions in a single query
+
+    Only columns that were actually selected are filled in, so payloads
+    deferred by summary projections are never fetched. The full payload
+    replaces the inline stub.
+    """
+    pending: List[Tuple[WorkflowExecution, str, str]] = []
+    for execution in executions:
+        loaded = execution.__dict__
+        for column, digest_column in PAYLOAD_COLUMNS.items():
+            digest = loaded.get(digest_column)
+            if digest and column in loaded:
+                pending.append((execution, column, digest))
+
+    if not pending:
+        return
+
+    payloads = load_payloads(session.connection(), (digest for _, _, digest in pending))
+    for execution, column, digest in pending:
+        if digest in payloads:
+            set_committed_value(execution, column, json.loads(payloads[digest]))
+
+
+def _offload_on_flush(session: Session, flush_context, instances):
+    """Swap large new or changed payloads for blob digests before they are written"""
+    offloaded = session.info[_OFFLOADED_KEY] = []
+    for obj in chain(session.new, session.dirty):
+        if not isinstance(obj, WorkflowExecution):
+            continue
+
+        state = inspect(obj)
+        for column, digest_column in PAYLOAD_COLUMNS.items():
+            if not state.pending and not state.attrs[column].history.has_changes():
+                continue
+
+            value = getattr(obj, column)
+            digest = store_payload(session.connection(), value)
+            setattr(obj, digest_column, digest)
+            if digest is not None:
+                setattr(obj, column, payload_stub(value))
+                offloaded.append((obj, column, value))
+
+
+def _restore_after_flush(session: Session, flush_context):
+    """Put offloaded payloads back on the in-memory objects without dirtying them"""
+    for obj, column, value in session.info.pop(_OFFLOADED_KEY, []):
+        set_committed_value(obj, column, value)
+
+
+def _hydrate_on_load(orm_execute_state):
+    """Fill in offloaded payloads of every execution a query loads"""
+    if (
+        not orm_execute_state.is_select
+        or WorkflowExecution.__mapper__ not in orm_execute_state.all_mappers
+        or not orm_execute_state.execution_options.get("hydrate_payloads", True)
+    ):
+        return None
+
+    frozen = orm_execute_state.invoke_statement().freeze()
+    hydrate_payloads(
+        orm_execute_state.session,
+        (item for row in frozen() for item in row if isinstance(item, WorkflowExecution))
+    )
+    return frozen()
+
+
+def register_payload_storage(session_factory):
+    """
+    Install the offload/hydrate hooks on a session factory
+
+    Queries that stream executions (yield_per) or never need payloads can
+    opt out of hydration with execution_options(hydrate_payloads=False).
+    """
+    event.listen(session_factory, "before_flush", _offload_on_flush)
+    event.listen(session_factory, "after_flush_postexec", _restore_after_flush)
+    event.listen(session_factory, "do_orm_execute", _hydrate_on_load)
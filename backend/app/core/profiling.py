@@ -0,0 +1,188 @@
+"""
+Request Profiling
+Opt-in sampling profiler for individual requests, with flamegraph-compatible output
+"""
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.security import ADMIN_TOKEN_HEADER, verify_admin_token
+
+
+class StackSampler:
+    """
+    Samples the stacks of all threads at a fixed interval
+
+    Sampling every thread (not just the event loop) also captures sync
+    endpoints and agent code running in the threadpool. Python cannot
+    tell which request a thread is working for, so the profile is
+    process-wide: it includes whatever else ran meanwhile. Stacks are
+    collapsed into "thread;frame;frame" keys, the format flamegraph.pl
+    and speedscope import directly.
+    """
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="flowmancer-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+
+
+class ProfileStore:
+    """
+    Bounded in-memory store of finished profiles, oldest evicted first
+    """
+
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Dict[str, Any]):
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Profile metadata, newest first, without the stack dumps"""
+        with self._lock:
+            return [
+                {key: value for key, value in profile.items() if key != "stacks"}
+                for profile in reversed(self._profiles.values())
+            ]
+
+
+profile_store = ProfileStore(settings.PROFILING_MAX_STORED)
+
+# Only one profile runs at a time, which bounds the sampling overhead
+_active = threading.Lock()
+
+
+def collapse(stacks: Counter) -> str:
+    """Render sampled stacks in collapsed "stack count" lines"""
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests
+
+    A request is profiled when it carries PROFILING_HEADER together with
+    a valid admin token, or when it is picked by PROFILING_SAMPLE_RATE.
+    On-demand profiles return their id in the X-Profile-Id response header;
+    profiles are fetched from /api/admin/profiles/{id}.
+
+    Profiles sample the whole process (scope "process") and record how
+    many other requests were in flight alongside the profiled one
+    (concurrent_requests), so stacks of concurrent work can be told
+    apart from a slow request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILING_HEADER.lower().encode("latin-1")
+        self.token_header = ADMIN_TOKEN_HEADER.lower().encode("latin-1")
+        # Requests in flight, and the most seen while the current profile runs
+        self.in_flight = 0
+        self.peak = 0
+
+    def _trigger(self, scope) -> Optional[str]:
+        headers = dict(scope.get("headers", []))
+        if self.header in headers:
+            token = headers.get(self.token_header, b"").decode("latin-1")
+            if verify_admin_token(token):
+                return "header"
+        if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await self._call(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _call(self, scope, receive, send):
+        trigger = self._trigger(scope)
+        if trigger is None or not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trigger == "header":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-id", profile_id.encode("latin-1"))
+                    ]
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILING_INTERVAL_MS)
+        self.peak = self.in_flight
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stacks = sampler.stop()
+            _active.release()
+            route = scope.get("route")
+            profile_store.add({
+                "id": profile_id,
+                "trigger": trigger,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route.path if route is not None else None,
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "samples": sampler.samples,
+                "scope": "process",
+                "concurrent_requests": self.peak - 1,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "stacks": collapse(stacks),
+            })
@@ -0,0 +1,57 @@
+"""
+Execution Projections
+Summary projections for list endpoints that skip the large JSON payload columns
+"""
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Query, defer
+from app.models import WorkflowExecution
+
+
+# Payload columns that can hold whole documents and email bodies
+HEAVY_COLUMNS = ("input_data", "output_data", "agent_logs")
+
+SUMMARY_COLUMNS = tuple(
+    column.key for column in WorkflowExecution.__table__.columns
+    if column.key not in HEAVY_COLUMNS
+)
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Parse a comma-separated `fields=` parameter into the heavy columns to include
+
+    Raises:
+        HTTPException: 400 for names that are not heavy columns
+    """
+    if not fields:
+        return []
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(HEAVY_COLUMNS))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(HEAVY_COLUMNS)}"
+        )
+    return [name for name in HEAVY_COLUMNS if name in requested]
+
+
+def summary_query(query: Query, fields: List[str]) -> Query:
+    """Defer every heavy column not explicitly requested"""
+    deferred = [
+        defer(getattr(WorkflowExecution, name))
+        for name in HEAVY_COLUMNS if name not in fields
+    ]
+    return query.options(*deferred) if deferred else query
+
+
+def project(execution: WorkflowExecution, fields: List[str]) -> Dict[str, Any]:
+    """
+    Serialize an execution loaded with summary_query()
+
+    Only touches loaded attributes, so deferred columns are never fetched
+    row by row. Combine with response_model_exclude_unset so that omitted
+    columns are left out of the response instead of returned as null.
+    """
+    return {name: getattr(execution, name) for name in (*SUMMARY_COLUMNS, *fields)}
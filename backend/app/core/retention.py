@@ -0,0 +1,322 @@
+"""
+Execution Retention
+Archives and compacts old executions in bounded batches according to per-workflow policies
+"""
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, delete, exists, func, null, or_, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import RETENTION_BATCH_DURATION, RETENTION_LAST_SUCCESS, RETENTION_ROWS
+from app.core.search import remove_documents
+from app.models import AgentTask, ExecutionBlob, Workflow, WorkflowExecution
+
+
+# Executions still in flight are never compacted or archived
+_FINISHED = WorkflowExecution.status.notin_(("pending", "running"))
+
+# Only one run at a time, whether scheduled or triggered from the admin API
+_running = threading.Lock()
+_last_run: Dict[str, Any] = {}
+
+
+def retention_policy(workflow: Optional[Workflow]) -> Dict[str, int]:
+    """
+    Effective retention of a workflow's executions
+
+    Workflow.config["retention"] may override payload_days and
+    summary_days; anything missing falls back to the RETENTION_* settings.
+    """
+    policy = {
+        "payload_days": settings.RETENTION_PAYLOAD_DAYS,
+        "summary_days": settings.RETENTION_SUMMARY_DAYS,
+    }
+    overrides = ((workflow.config or {}).get("retention") if workflow else None) or {}
+    policy.update({key: int(value) for key, value in overrides.items() if key in policy})
+    return policy
+
+
+class ArchiveWriter:
+    """
+    Compressed JSON-lines archive, created on the first write of a run
+
+    Each batch is flushed before its DB transaction commits, so a crash
+    can at worst archive a batch twice but never lose one.
+    """
+
+    def __init__(self, directory: str, codec: str):
+        self.directory = directory
+        self.codec = codec
+        self.path: Optional[str] = None
+        self._file = None
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        if self.codec == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise RuntimeError("RETENTION_ARCHIVE_CODEC=zstd requires the zstandard package") from e
+            self.path = os.path.join(self.directory, f"executions-{stamp}.jsonl.zst")
+            self._file = zstandard.open(self.path, "wt", encoding="utf-8")
+        else:
+            self.path = os.path.join(self.directory, f"executions-{stamp}.jsonl.gz")
+            self._file = gzip.open(self.path, "wt", encoding="utf-8")
+
+    def write(self, records: List[Dict[str, Any]]):
+        if self._file is None:
+            self._open()
+        for record in records:
+            self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def _row(obj: Any) -> Dict[str, Any]:
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+
+
+def _expired_ids(db: Session, workflow_id: Optional[int], cutoff: datetime, *criteria) -> List[int]:
+    """Next batch of expired execution ids of a workflow (None: of deleted workflows)"""
+    if workflow_id is None:
+        owner = WorkflowExecution.workflow_id.notin_(select(Workflow.id))
+    else:
+        owner = WorkflowExecution.workflow_id == workflow_id
+
+    return db.execute(
+        select(WorkflowExecution.id)
+        .where(owner, WorkflowExecution.started_at < cutoff, _FINISHED, *criteria)
+        .order_by(WorkflowExecution.id)
+        .limit(settings.RETENTION_BATCH_SIZE)
+    ).scalars().all()
+
+
+def _archive(db: Session, ids: List[int], phase: str, writer: ArchiveWriter):
+    """Write full executions, payloads and agent tasks included, to the archive"""
+    tasks: Dict[int, List[Dict[str, Any]]] = {}
+    for task in db.query(AgentTask).filter(AgentTask.execution_id.in_(ids)).order_by(AgentTask.id):
+        tasks.setdefault(task.execution_id, []).append(_row(task))
+
+    executions = db.query(WorkflowExecution).filter(
+        WorkflowExecution.id.in_(ids)
+    ).order_by(WorkflowExecution.id).all()
+
+    writer.write([
+        {"phase": phase, "execution": _row(execution), "agent_tasks": tasks.get(execution.id, [])}
+        for execution in executions
+    ])
+
+
+def _compact(db: Session, ids: List[int]):
+    """Drop payloads, their search documents and agent task details, keeping the execution summaries"""
+    remove_documents(db, ids)
+    db.execute(
+        update(WorkflowExecution)
+        .where(WorkflowExecution.id.in_(ids))
+        .values(
+            input_data=null(),
+            output_data=null(),
+            agent_logs=null(),
+            input_blob_digest=None,
+            output_blob_digest=None,
+            compacted_at=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(AgentTask)
+        .where(AgentTask.execution_id.in_(ids))
+        .values(input_data=null(), output_data=null(), reasoning=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _purge(db: Session, ids: List[int]):
+    """Delete executions with their agent tasks and search documents"""
+    remove_documents(db, ids)
+    db.execute(
+        delete(AgentTask).where(AgentTask.execution_id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(WorkflowExecution).where(WorkflowExecution.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _run_phase(
+    db: Session,
+    phase: str,
+    workflow_id: Optional[int],
+    cutoff: datetime,
+    writer: ArchiveWriter,
+    counts: Dict[str, int],
+    *criteria
+):
+    """Archive and compact (or purge) expired executions one short transaction at a time"""
+    while True:
+        ids = _expired_ids(db, workflow_id, cutoff, *criteria)
+        if not ids:
+            return
+
+        start = time.perf_counter()
+        _archive(db, ids, phase, writer)
+        if phase == "payloads":
+            _compact(db, ids)
+        else:
+            _purge(db, ids)
+        db.commit()
+        db.expunge_all()
+
+        RETENTION_BATCH_DURATION.labels(phase).observe(time.perf_counter() - start)
+        RETENTION_ROWS.labels(phase).inc(len(ids))
+        counts[phase] += len(ids)
+
+        if len(ids) < settings.RETENTION_BATCH_SIZE:
+            return
+        time.sleep(settings.RETENTION_BATCH_PAUSE_MS / 1000)
+
+
+def _collect_blobs(db: Session, counts: Dict[str, int]):
+    """
+    Delete payload blobs no execution refers to any more
+
+    Blobs stored or reused within RETENTION_BLOB_GRACE_MINUTES are kept:
+    the execution referring to them may not have committed yet, and the
+    reference check cannot see it until it has.
+    """
+    grace_cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.RETENTION_BLOB_GRACE_MINUTES)
+    unreferenced = and_(
+        func.coalesce(ExecutionBlob.last_used_at, ExecutionBlob.created_at) < grace_cutoff,
+        ~or_(
+            exists().where(WorkflowExecution.input_blob_digest == ExecutionBlob.digest),
+            exists().where(WorkflowExecution.output_blob_digest == ExecutionBlob.digest),
+        ),
+    )
+    while True:
+        digests = db.execute(
+            select(ExecutionBlob.digest).where(unreferenced).limit(settings.RETENTION_BATCH_SIZE)
+        ).scalars().all()
+        if not digests:
+            return
+
+        start = time.perf_counter()
+        # Re-checked in the DELETE in case an execution picked the blob up meanwhile (which bumps last_used_at)
+        db.execute(
+            delete(ExecutionBlob)
+            .where(ExecutionBlob.digest.in_(digests), unreferenced)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        RETENTION_BATCH_DURATION.labels("blobs").observe(time.perf_counter() - start)
+        RETENTION_ROWS.labels("blobs").inc(len(digests))
+        counts["blobs"] += len(digests)
+
+        if len(digests) < settings.RETENTION_BATCH_SIZE:
+            return
+        time.sleep(settings.RETENTION_BATCH_PAUSE_MS / 1000)
+
+
+def _check_archive_dir():
+    """
+    Raises:
+        RuntimeError: RETENTION_ARCHIVE_DIR is not an absolute path, so
+            archives could end up on ephemeral storage
+    """
+    if not os.path.isabs(settings.RETENTION_ARCHIVE_DIR):
+        raise RuntimeError(
+            "RETENTION_ARCHIVE_DIR must be an absolute path on persistent storage before retention removes data"
+        )
+
+
+def run_retention() -> Dict[str, Any]:
+    """
+    Apply retention policies once
+
+    Executions past payload_days are archived and stripped of their
+    payloads; executions past summary_days are archived and deleted;
+    unreferenced payload blobs are removed. Nothing is removed unless
+    RETENTION_ARCHIVE_DIR is set to an absolute path. Blocking, so call
+    it from a worker thread.
+
+    Returns:
+        Summary of the run (rows per phase, archive path, error)
+    """
+    if not _running.acquire(blocking=False):
+        return {**_last_run, "running": True}
+
+    counts = {"payloads": 0, "summaries": 0, "blobs": 0}
+    run: Dict[str, Any] = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "finished_at": None,
+        "rows": counts,
+        "archive": None,
+        "error": None,
+    }
+    db = SessionLocal()
+    writer = ArchiveWriter(settings.RETENTION_ARCHIVE_DIR, settings.RETENTION_ARCHIVE_CODEC)
+
+    try:
+        now = datetime.now(timezone.utc)
+        targets = [(workflow.id, retention_policy(workflow)) for workflow in db.query(Workflow).all()]
+        targets.append((None, retention_policy(None)))
+        if any(days > 0 for _, policy in targets for days in policy.values()):
+            _check_archive_dir()
+
+        for workflow_id, policy in targets:
+            if policy["payload_days"] > 0:
+                _run_phase(
+                    db, "payloads", workflow_id, now - timedelta(days=policy["payload_days"]),
+                    writer, counts, WorkflowExecution.compacted_at.is_(None)
+                )
+            if policy["summary_days"] > 0:
+                _run_phase(
+                    db, "summaries", workflow_id, now - timedelta(days=policy["summary_days"]),
+                    writer, counts
+                )
+
+        _collect_blobs(db, counts)
+        RETENTION_LAST_SUCCESS.set_to_current_time()
+
+    except Exception as e:
+        db.rollback()
+        run["error"] = str(e)
+        raise
+
+    finally:
+        writer.close()
+        db.close()
+        run["archive"] = writer.path
+        run["finished_at"] = datetime.now(timezone.utc).isoformat()
+        _last_run.clear()
+        _last_run.update(run)
+        _running.release()
+
+    return run
+
+
+def retention_status() -> Dict[str, Any]:
+    """Summary of the last run and whether one is in progress"""
+    return {**_last_run, "running": _running.locked()}
+
+
+async def retention_loop():
+    """Run retention every RETENTION_INTERVAL_MINUTES until cancelled"""
+    while True:
+        await asyncio.sleep(settings.RETENTION_INTERVAL_MINUTES * 60)
+        try:
+            await asyncio.to_thread(run_retention)
+        except Exception as e:
+            print(f"⚠️ Retention run failed: {e}")
@@ -0,0 +1,280 @@
+"""
+Execution Scheduler
+Priority classes, per-workflow and per-workflow_type concurrency limits and weighted fair dispatch of executions
+"""
+import asyncio
+import functools
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.metrics import EXECUTION_QUEUE_DEPTH, EXECUTION_QUEUE_WAIT
+from app.core.workflow_cache import WorkflowDefinition
+
+
+# Priority classes, most urgent first; their share of dispatches is set by EXECUTION_PRIORITY_WEIGHTS
+PRIORITIES = ("interactive", "webhook", "bulk")
+
+# Weight of the latest run in the mean run duration
+_EWMA_ALPHA = 0.2
+
+
+def scheduling_options(workflow: WorkflowDefinition) -> Dict[str, Any]:
+    """
+    Workflow.config["scheduling"]: priority (default class), weight
+    (share within a class, default 1) and max_concurrency
+    """
+    return (workflow.config or {}).get("scheduling") or {}
+
+
+def resolve_priority(workflow: WorkflowDefinition, requested: Optional[str], default: str) -> str:
+    """Priority class of an execution: the requested one, else the workflow's, else the endpoint's default"""
+    if requested:
+        return requested
+    priority = scheduling_options(workflow).get("priority")
+    return priority if priority in PRIORITIES else default
+
+
+@dataclass
+class ScheduledExecution:
+    """An execution waiting for a slot"""
+    execution_id: int
+    workflow_id: int
+    workflow_type: str
+    priority: str
+    run: Callable[[], Awaitable[None]]
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class _Queue:
+    """FIFO of one workflow's executions in one priority class"""
+    weight: float
+    pass_value: float
+    items: Deque[ScheduledExecution] = field(default_factory=deque)
+
+
+class ExecutionScheduler:
+    """
+    Runs executions on the event loop, at most EXECUTION_CONCURRENCY at once
+
+    Executions wait in one FIFO per (priority class, workflow). Slots go
+    to queues by stride scheduling: each dispatch advances the queue's
+    pass by 1 / weight, with weight the class weight times the
+    workflow's scheduling weight, and the lowest pass goes next. Every
+    class and workflow therefore gets a share of slots proportional to
+    its weight, so a backfill cannot starve real-time traffic and is not
+    starved by it either. Queues whose workflow or workflow_type is at
+    its max_concurrency (Workflow.config["scheduling"],
+    EXECUTION_TYPE_CONCURRENCY) are skipped until a run finishes.
+    """
+
+    def __init__(self):
+        self._reset()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.mean_run_seconds = 0.0
+
+    def _reset(self):
+        self._queues: Dict[Tuple[str, int], _Queue] = {}
+        self._virtual_time = 0.0
+        self._queued = 0
+        self._running = 0
+        self._running_workflows: Counter = Counter()
+        self._running_types: Counter = Counter()
+        self._limits: Dict[int, int] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._started: Set[int] = set()
+        self.draining = False
+
+    def submit(
+        self,
+        workflow: WorkflowDefinition,
+        execution_id: int,
+        priority: str,
+        run: Callable[[], Awaitable[None]]
+    ):
+        """
+        Queue an execution; `run` is awaited once it gets a slot
+
+        Must be called from the event loop executions run on.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Executions queued on a previous event loop can no longer be run
+            self._reset()
+            self._loop = loop
+
+        options = scheduling_options(workflow)
+        if options.get("max_concurrency"):
+            self._limits[workflow.id] = int(options["max_concurrency"])
+        else:
+            self._limits.pop(workflow.id, None)
+
+        key = (priority, workflow.id)
+        queue = self._queues.get(key)
+        if queue is None:
+            # New queues start at the current virtual time rather than
+            # catching up on dispatches they were not waiting for
+            weight = settings.EXECUTION_PRIORITY_WEIGHTS.get(priority, 1.0) * float(options.get("weight") or 1.0)
+            queue = self._queues[key] = _Queue(weight=max(weight, 1e-6), pass_value=self._virtual_time)
+        queue.items.append(ScheduledExecution(execution_id, workflow.id, workflow.workflow_type, priority, run))
+        self._queued += 1
+        EXECUTION_QUEUE_DEPTH.inc()
+        self._dispatch()
+
+    async def cancel(self, execution_id: int) -> Optional[str]:
+        """
+        Cancel an execution of this process
+
+        A queued execution is dropped without running; a running one has
+        its task cancelled, and this waits for the runner to record the
+        cancellation and give up its slot. A task cancelled before its
+        first step never reaches the runner, so it counts as queued.
+
+        Returns:
+            "queued" or "running", or None if the execution is not here
+        """
+        for key, queue in self._queues.items():
+            for item in queue.items:
+                if item.execution_id == execution_id:
+                    queue.items.remove(item)
+                    if not queue.items:
+                        del self._queues[key]
+                    self._queued -= 1
+                    EXECUTION_QUEUE_DEPTH.dec()
+                    return "queued"
+
+        task = self._tasks.get(execution_id)
+        if task is None:
+            return None
+        started = execution_id in self._started
+        task.cancel()
+        await asyncio.wait([task])
+        return "running" if started else "queued"
+
+    def _take_queued(self) -> List[int]:
+        """Empty the queues, returning the ids of the executions that were in them"""
+        execution_ids = [item.execution_id for queue in self._queues.values() for item in queue.items]
+        EXECUTION_QUEUE_DEPTH.dec(len(execution_ids))
+        self._queues = {}
+        self._queued = 0
+        return execution_ids
+
+    async def drain(self, grace_seconds: float) -> List[int]:
+        """
+        Stop starting executions and wind down the running ones
+
+        Queued executions are taken out and returned for the caller to
+        hand back. Running ones get grace_seconds to finish; the rest are
+        then cancelled while `draining` is set, which their runners take
+        as a request to checkpoint and requeue rather than to cancel.
+
+        Returns:
+            Ids of the executions that were queued and never started
+        """
+        self.draining = True
+        queued = self._take_queued()
+        tasks = dict(self._tasks)
+        if tasks:
+            _, unfinished = await asyncio.wait(tasks.values(), timeout=grace_seconds)
+            # Tasks cancelled before their first step never reach the runner to requeue themselves
+            queued += [
+                execution_id for execution_id, task in tasks.items()
+                if task in unfinished and execution_id not in self._started
+            ]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.wait(unfinished)
+        # Submitted while waiting (e.g. by requests admitted just before the drain)
+        return queued + self._take_queued()
+
+    def execution_ids(self) -> List[int]:
+        """Executions queued or running here"""
+        queued = [item.execution_id for queue in self._queues.values() for item in queue.items]
+        return queued + list(self._tasks)
+
+    def load(self) -> int:
+        """Executions queued or running"""
+        return self._queued + self._running
+
+    def depths(self) -> Dict[str, int]:
+        """Queued executions per priority class"""
+        depths = dict.fromkeys(PRIORITIES, 0)
+        for (priority, _), queue in self._queues.items():
+            depths[priority] = depths.get(priority, 0) + len(queue.items)
+        return depths
+
+    def _has_capacity(self, item: ScheduledExecution) -> bool:
+        workflow_limit = self._limits.get(item.workflow_id)
+        if workflow_limit and self._running_workflows[item.workflow_id] >= workflow_limit:
+            return False
+        type_limit = settings.EXECUTION_TYPE_CONCURRENCY.get(item.workflow_type)
+        return not type_limit or self._running_types[item.workflow_type] < type_limit
+
+    def _next(self) -> Optional[ScheduledExecution]:
+        """Take the next execution to run, or None if nothing can run now"""
+        eligible = [
+            (queue.pass_value, key)
+            for key, queue in self._queues.items()
+            if self._has_capacity(queue.items[0])
+        ]
+        if not eligible:
+            return None
+
+        _, key = min(eligible)
+        queue = self._queues[key]
+        item = queue.items.popleft()
+        self._virtual_time = queue.pass_value
+        queue.pass_value += 1 / queue.weight
+        if not queue.items:
+            del self._queues[key]
+        return item
+
+    def _dispatch(self):
+        while not self.draining and self._running < settings.EXECUTION_CONCURRENCY:
+            item = self._next()
+            if item is None:
+                return
+            self._queued -= 1
+            self._running += 1
+            self._running_workflows[item.workflow_id] += 1
+            self._running_types[item.workflow_type] += 1
+            EXECUTION_QUEUE_DEPTH.dec()
+            EXECUTION_QUEUE_WAIT.labels(item.priority).observe(time.perf_counter() - item.enqueued_at)
+
+            task = self._loop.create_task(self._execute(item))
+            self._tasks[item.execution_id] = task
+            # Released from the callback: a task cancelled before its first step never enters _execute
+            task.add_done_callback(functools.partial(self._release, item))
+
+    async def _execute(self, item: ScheduledExecution):
+        self._started.add(item.execution_id)
+        start = time.perf_counter()
+        try:
+            await item.run()
+        except Exception as e:
+            print(f"⚠️ Execution of workflow {item.workflow_id} failed outside its runner: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            self.mean_run_seconds = elapsed if not self.mean_run_seconds else (
+                _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * self.mean_run_seconds
+            )
+
+    def _release(self, item: ScheduledExecution, task: asyncio.Task):
+        """Give up the slot of a finished task and start whatever can run next"""
+        if task.get_loop() is not self._loop:
+            # Slots of a previous event loop were reset with it
+            return
+        self._running -= 1
+        self._running_workflows[item.workflow_id] -= 1
+        self._running_types[item.workflow_type] -= 1
+        if self._tasks.get(item.execution_id) is task:
+            del self._tasks[item.execution_id]
+        self._started.discard(item.execution_id)
+        self._dispatch()
+
+
+# Shared by all requests of the process
+execution_scheduler = ExecutionScheduler()
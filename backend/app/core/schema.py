@@ -0,0 +1,94 @@
+"""
+Schema Upgrades
+Brings databases created by earlier versions up to the current models, in place and idempotently
+"""
+from typing import List
+from sqlalchemy import MetaData, inspect
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Connection, Dialect
+from sqlalchemy.schema import Column, Table
+
+
+def _default_clause(column: Column, dialect: Dialect) -> str:
+    """
+    DEFAULT of a column added to an existing table, so existing rows get
+    a value (required for NOT NULL columns)
+
+    SQLite only accepts constant defaults in ALTER TABLE ADD COLUMN, so
+    server defaults like now() are left off there; existing rows keep NULL.
+    """
+    server_default = column.server_default
+    if server_default is not None:
+        arg = server_default.arg
+        if isinstance(arg, str):
+            return f" DEFAULT '{arg}'"
+        if dialect.name != "sqlite":
+            return f" DEFAULT {arg.compile(dialect=dialect)}"
+        return ""
+    if column.default is not None and column.default.is_scalar:
+        value = column.default.arg
+        return f" DEFAULT {int(value) if isinstance(value, bool) else value!r}"
+    return ""
+
+
+def _add_columns(connection: Connection, table: Table, existing: List[str]) -> List[str]:
+    dialect = connection.dialect
+    statements = []
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        default = _default_clause(column, dialect)
+        ddl = f"{column.name} {column.type.compile(dialect=dialect)}{default}"
+        if not column.nullable and default:
+            ddl += " NOT NULL"
+        statements.append(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+    return statements
+
+
+def _convert_json_columns(connection: Connection, table: Table, columns: List[dict]) -> List[str]:
+    """JSON columns that became JSONB on Postgres"""
+    if connection.dialect.name != "postgresql":
+        return []
+    reflected = {column["name"]: column["type"] for column in columns}
+    statements = []
+    for column in table.columns:
+        wanted = column.type.dialect_impl(connection.dialect)
+        if isinstance(wanted, JSONB) and column.name in reflected and not isinstance(reflected[column.name], JSONB):
+            statements.append(
+                f"ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE JSONB USING {column.name}::jsonb"
+            )
+    return statements
+
+
+def upgrade_schema(connection: Connection, metadata: MetaData) -> List[str]:
+    """
+    Add the columns and indexes that tables created by earlier versions
+    are missing, and move JSON columns that became JSONB on Postgres
+
+    create_all() only creates missing tables; this covers the columns
+    added to existing ones since (timings, token usage, version,
+    priority, leases, compaction, search, ...). Every step checks the
+    live schema first, so running it on every startup is safe.
+
+    Returns:
+        The ALTER TABLE statements that were executed
+    """
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    executed = []
+    for table in metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        columns = inspector.get_columns(table.name)
+        statements = _add_columns(connection, table, [column["name"] for column in columns])
+        statements += _convert_json_columns(connection, table, columns)
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+        executed += statements
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                # Indexes limited to another dialect (ddl_if) are skipped by create()
+                index.create(connection)
+    return executed
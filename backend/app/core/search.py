@@ -0,0 +1,176 @@
+"""
+Execution Search
+Extracts searchable text from execution payloads, keeps the index in sync and runs ranked queries
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import delete, event, inspect, text
+from sqlalchemy.orm import Session
+from app.models import ExecutionSearch, WorkflowExecution
+
+
+# Payload keys worth searching; dicts and lists under them are flattened
+SEARCH_FIELDS = {
+    "input_data": (
+        "subject", "body", "from_email", "name", "email", "company",
+        "message", "source", "document_type", "file_content", "metadata",
+    ),
+    # What the processors write: lead assessments, email analyses and extracted document fields
+    "output_data": ("assessment", "result"),
+}
+
+# Longest document indexed per execution (Postgres caps a tsvector at 1 MB)
+SEARCH_MAX_CHARS = 100_000
+
+_PENDING_KEY = "pending_search_documents"
+
+
+def _flatten(value: Any) -> List[str]:
+    if isinstance(value, dict):
+        return [item for nested in value.values() for item in _flatten(nested)]
+    if isinstance(value, list):
+        return [item for nested in value for item in _flatten(nested)]
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return [str(value)]
+    return []
+
+
+def search_document(input_data: Any, output_data: Any) -> str:
+    """Searchable text of an execution's input and output payloads"""
+    parts: List[str] = []
+    for payload, keys in ((input_data, SEARCH_FIELDS["input_data"]), (output_data, SEARCH_FIELDS["output_data"])):
+        if isinstance(payload, dict):
+            for key in keys:
+                parts.extend(_flatten(payload.get(key)))
+    return "\n".join(parts)[:SEARCH_MAX_CHARS]
+
+
+def upsert_documents(session: Session, documents: List[Dict[str, Any]]):
+    """Insert or replace search documents ({"execution_id", "document"} dicts)"""
+    table = ExecutionSearch.__table__
+    connection = session.connection()
+    dialect = connection.dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["execution_id"],
+                set_={"document": stmt.excluded.document}
+            ),
+            documents
+        )
+        return
+
+    connection.execute(
+        table.delete().where(table.c.execution_id.in_([doc["execution_id"] for doc in documents]))
+    )
+    connection.execute(table.insert(), documents)
+
+
+def _collect_on_flush(session: Session, flush_context, instances):
+    """
+    Remember executions whose payloads change in this flush
+
+    Must run before payload offloading replaces large payloads with stubs.
+    """
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, WorkflowExecution):
+            continue
+        state = inspect(obj)
+        if state.pending or any(
+            state.attrs[column].history.has_changes() for column in SEARCH_FIELDS
+        ):
+            pending.append((obj, search_document(obj.input_data, obj.output_data)))
+
+
+def _index_after_flush(session: Session, flush_context):
+    """Write the collected documents now that new executions have ids"""
+    pending = session.info.pop(_PENDING_KEY, [])
+    documents = [
+        {"execution_id": obj.id, "document": document}
+        for obj, document in pending if document
+    ]
+    if documents:
+        upsert_documents(session, documents)
+
+
+def register_search_index(session_factory):
+    """
+    Keep execution_search in sync with execution payloads
+
+    Register before register_payload_storage(): listeners run in
+    registration order and the full payloads are needed here.
+    """
+    event.listen(session_factory, "before_flush", _collect_on_flush)
+    event.listen(session_factory, "after_flush", _index_after_flush)
+
+
+def remove_documents(db: Session, execution_ids: List[int]):
+    """Drop search documents, e.g. when retention removes the payloads"""
+    db.execute(
+        delete(ExecutionSearch).where(ExecutionSearch.execution_id.in_(execution_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each term so user input cannot form FTS5 syntax; terms are ANDed"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search_executions(
+    db: Session,
+    query: str,
+    workflow_id: Optional[int],
+    limit: int,
+    offset: int
+) -> List[Tuple[int, float, str]]:
+    """
+    Run a ranked full-text query
+
+    Postgres parses the query with websearch_to_tsquery (quotes, OR, -term)
+    and ranks with ts_rank_cd; SQLite uses FTS5 with bm25.
+
+    Returns:
+        (execution_id, rank, snippet) tuples, best match first; none for
+        a query without terms (e.g. only whitespace)
+    """
+    if not query.split():
+        return []
+
+    params: Dict[str, Any] = {"limit": limit, "offset": offset}
+    workflow_filter = ""
+    if workflow_id is not None:
+        workflow_filter = "AND e.workflow_id = :workflow_id"
+        params["workflow_id"] = workflow_id
+
+    if db.get_bind().dialect.name == "postgresql":
+        params["query"] = query
+        sql = f"""
+            SELECT s.execution_id, ts_rank_cd(s.search_vector, q) AS rank,
+                   ts_headline('english', s.document, q, 'MaxFragments=1, MaxWords=20') AS snippet
+            FROM execution_search s
+            JOIN workflow_executions e ON e.id = s.execution_id,
+                 websearch_to_tsquery('english', :query) q
+            WHERE s.search_vector @@ q {workflow_filter}
+            ORDER BY rank DESC, s.execution_id DESC
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        params["query"] = _fts5_query(query)
+        sql = f"""
+            SELECT f.rowid AS execution_id, -bm25(execution_search_fts) AS rank,
+                   snippet(execution_search_fts, 0, '[', ']', '...', 16) AS snippet
+            FROM execution_search_fts f
+            JOIN workflow_executions e ON e.id = f.rowid
+            WHERE execution_search_fts MATCH :query {workflow_filter}
+            ORDER BY rank DESC, f.rowid DESC
+            LIMIT :limit OFFSET :offset
+        """
+
+    return [tuple(row) for row in db.execute(text(sql), params).all()]
@@ -0,0 +1,31 @@
+"""
+Admin Authentication
+Shared admin-token check for operational endpoints and request hooks
+"""
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException
+from app.core.config import settings
+
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def verify_admin_token(token: Optional[str]) -> bool:
+    """
+    Check a presented token against ADMIN_TOKEN
+
+    Always fails when no ADMIN_TOKEN is configured. Compared as UTF-8
+    bytes, since compare_digest rejects str with non-ASCII characters.
+    """
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8"))
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Dependency guarding admin endpoints
+    """
+    if not verify_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -0,0 +1,234 @@
+"""
+Execution Statistics
+Hourly rollups of execution counts, latency histograms and LLM usage, updated as executions finish
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.models import ExecutionStats, WorkflowExecution
+
+
+# Upper bounds of the latency histogram columns, in milliseconds; fine at the low end so fast
+# executions don't get percentiles interpolated across a wide first bucket
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+LATENCY_COLUMNS = [f"latency_le_{bound}" for bound in LATENCY_BUCKETS_MS] + ["latency_le_inf"]
+
+COUNTER_COLUMNS = [
+    "executions",
+    "completed",
+    "failed",
+    "duration_ms_sum",
+    *LATENCY_COLUMNS,
+    "llm_calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "cost_usd",
+]
+
+
+def bucket_start(moment: datetime) -> datetime:
+    """Start of the hourly bucket a moment falls into"""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _increments(execution: Any) -> Dict[str, Any]:
+    """Counter increments contributed by one finished execution (model or row)"""
+    duration = execution.duration_ms or 0
+    latency_column = next(
+        (column for bound, column in zip(LATENCY_BUCKETS_MS, LATENCY_COLUMNS) if duration <= bound),
+        "latency_le_inf"
+    )
+
+    values: Dict[str, Any] = {column: 0 for column in COUNTER_COLUMNS}
+    values.update({
+        "executions": 1,
+        "completed": int(execution.status == "completed"),
+        "failed": int(execution.status == "failed"),
+        "duration_ms_sum": duration,
+        latency_column: 1,
+        "llm_calls": execution.llm_calls or 0,
+        "prompt_tokens": execution.prompt_tokens or 0,
+        "completion_tokens": execution.completion_tokens or 0,
+        "total_tokens": execution.total_tokens or 0,
+        "cost_usd": execution.cost_usd or 0.0,
+    })
+    return values
+
+
+def _upsert(db: Session, workflow_id: int, start: datetime, values: Dict[str, Any]):
+    """Add counter values to a bucket, creating it if needed"""
+    table = ExecutionStats.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(workflow_id=workflow_id, bucket_start=start, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["workflow_id", "bucket_start"],
+            set_={column: table.c[column] + stmt.excluded[column] for column in COUNTER_COLUMNS}
+        )
+        db.execute(stmt)
+        return
+
+    result = db.execute(
+        update(table)
+        .where(table.c.workflow_id == workflow_id, table.c.bucket_start == start)
+        .values({column: table.c[column] + values[column] for column in COUNTER_COLUMNS})
+    )
+    if result.rowcount == 0:
+        db.execute(table.insert().values(workflow_id=workflow_id, bucket_start=start, **values))
+
+
+def record_execution_stats(db: Session, execution: WorkflowExecution):
+    """
+    Add a finished execution to the current hour's rollup
+
+    Runs in the caller's transaction, so the rollup commits together
+    with the execution's final status.
+    """
+    record_executions_stats(db, [execution])
+
+
+def record_executions_stats(db: Session, executions: Iterable[Any]):
+    """
+    Add several finished executions (models or rows) to the current hour's rollup
+
+    Increments are summed per workflow first, so a batch costs one
+    upsert per workflow rather than one per execution.
+    """
+    totals: Dict[int, Dict[str, Any]] = {}
+    for execution in executions:
+        workflow_totals = totals.setdefault(execution.workflow_id, {column: 0 for column in COUNTER_COLUMNS})
+        for column, value in _increments(execution).items():
+            workflow_totals[column] += value
+
+    start = bucket_start(datetime.now(timezone.utc))
+    for workflow_id, values in totals.items():
+        _upsert(db, workflow_id, start, values)
+
+
+def rebuild_stats(db: Session) -> int:
+    """
+    Recompute the whole rollup from workflow_executions
+
+    Needed once for executions that finished before the rollup existed.
+    Rows already removed by retention are not restored.
+
+    Returns:
+        Number of executions counted
+    """
+    buckets: Dict[Tuple[int, datetime], Dict[str, Any]] = {}
+    executions = db.execute(
+        select(
+            WorkflowExecution.workflow_id,
+            WorkflowExecution.status,
+            WorkflowExecution.started_at,
+            WorkflowExecution.completed_at,
+            WorkflowExecution.duration_ms,
+            WorkflowExecution.llm_calls,
+            WorkflowExecution.prompt_tokens,
+            WorkflowExecution.completion_tokens,
+            WorkflowExecution.total_tokens,
+            WorkflowExecution.cost_usd,
+        )
+        .where(WorkflowExecution.status.in_(("completed", "failed", "cancelled")))
+        .execution_options(yield_per=1000, hydrate_payloads=False)
+    )
+
+    counted = 0
+    for execution in executions:
+        key = (execution.workflow_id, bucket_start(execution.completed_at or execution.started_at))
+        totals = buckets.setdefault(key, {column: 0 for column in COUNTER_COLUMNS})
+        for column, value in _increments(execution).items():
+            totals[column] += value
+        counted += 1
+
+    db.query(ExecutionStats).delete(synchronize_session=False)
+    if buckets:
+        db.execute(ExecutionStats.__table__.insert(), [
+            {"workflow_id": workflow_id, "bucket_start": start, **values}
+            for (workflow_id, start), values in buckets.items()
+        ])
+    db.commit()
+    return counted
+
+
+def estimate_percentile(counts: List[int], quantile: float) -> Optional[float]:
+    """
+    Estimate a latency percentile from histogram counts
+
+    Interpolates linearly within the bucket holding the requested rank;
+    ranks in the open-ended last bucket report its lower bound.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+
+    rank = quantile * total
+    cumulative = 0
+    lower = 0
+    for bound, count in zip((*LATENCY_BUCKETS_MS, None), counts):
+        if count and cumulative + count >= rank:
+            if bound is None:
+                return float(lower)
+            return round(lower + (bound - lower) * (rank - cumulative) / count, 3)
+        cumulative += count
+        lower = bound if bound is not None else lower
+    return float(lower)
+
+
+def load_stats(db: Session, hours: int, workflow_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Aggregate the rollup over the last `hours` hourly buckets
+
+    Reads at most `hours` rows per workflow, independent of how many
+    executions ran.
+    """
+    since = bucket_start(datetime.now(timezone.utc)) - timedelta(hours=hours - 1)
+    table = ExecutionStats.__table__
+
+    query = select(
+        table.c.bucket_start,
+        *[func.sum(table.c[column]).label(column) for column in COUNTER_COLUMNS]
+    ).where(table.c.bucket_start >= since)
+    if workflow_id is not None:
+        query = query.where(table.c.workflow_id == workflow_id)
+    rows = db.execute(query.group_by(table.c.bucket_start).order_by(table.c.bucket_start)).all()
+
+    totals = {column: sum(getattr(row, column) for row in rows) for column in COUNTER_COLUMNS}
+    latency = [totals[column] for column in LATENCY_COLUMNS]
+    executions = totals["executions"]
+
+    return {
+        "workflow_id": workflow_id,
+        "hours": hours,
+        "executions": executions,
+        "completed": totals["completed"],
+        "failed": totals["failed"],
+        "avg_ms": round(totals["duration_ms_sum"] / executions, 3) if executions else None,
+        "p50_ms": estimate_percentile(latency, 0.5),
+        "p95_ms": estimate_percentile(latency, 0.95),
+        "p99_ms": estimate_percentile(latency, 0.99),
+        "llm_calls": totals["llm_calls"],
+        "prompt_tokens": totals["prompt_tokens"],
+        "completion_tokens": totals["completion_tokens"],
+        "total_tokens": totals["total_tokens"],
+        "cost_usd": totals["cost_usd"],
+        "buckets": [
+            {
+                "start": row.bucket_start,
+                "executions": row.executions,
+                "completed": row.completed,
+                "failed": row.failed,
+                "avg_ms": round(row.duration_ms_sum / row.executions, 3) if row.executions else None,
+                "total_tokens": row.total_tokens,
+                "cost_usd": row.cost_usd,
+            }
+            for row in rows
+        ],
+    }
@@ -0,0 +1,340 @@
+"""
+Status Writer
+Coalesces execution state transitions into grouped UPDATEs committed in batches on a short interval
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import Integer, bindparam, column, func, update, values
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, replica_router
+from app.core.events import execution_events
+from app.core.metrics import (
+    STATUS_COMMITS,
+    STATUS_COMMITS_SAVED,
+    STATUS_FLUSH_DURATION,
+    STATUS_TRANSITIONS
+)
+from app.core.payloads import offload_payloads
+from app.core.search import upsert_documents
+from app.core.stats import record_executions_stats
+from app.models import AgentTask, WorkflowExecution
+
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# Execution columns the stats rollup reads, for transitions that leave some out
+_STATS_COLUMNS = ("duration_ms", "llm_calls", "prompt_tokens", "completion_tokens", "total_tokens", "cost_usd")
+
+
+def status_event(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Data of the "status" event for a written transition (payloads stay behind GET /executions/{id})"""
+    return {name: values[name] for name in ("status", "error_message", "duration_ms") if values.get(name) is not None}
+
+
+@dataclass
+class Transition:
+    """Pending writes for one execution; later transitions are merged into earlier ones"""
+    execution_id: int
+    workflow_id: Optional[int] = None
+    values: Dict[str, Any] = field(default_factory=dict)
+    agent_tasks: List[Dict[str, Any]] = field(default_factory=list)
+    document: Optional[str] = None
+    waiters: List[asyncio.Future] = field(default_factory=list)
+    submitted: int = 1
+    applied: bool = False  # Set once written; False if the row was already cancelled
+
+    @property
+    def terminal(self) -> bool:
+        return self.values.get("status") in TERMINAL_STATUSES
+
+    def merge(self, other: "Transition"):
+        self.workflow_id = other.workflow_id if other.workflow_id is not None else self.workflow_id
+        self.values.update(other.values)
+        self.agent_tasks.extend(other.agent_tasks)
+        self.document = other.document if other.document is not None else self.document
+        self.waiters.extend(other.waiters)
+        self.submitted += other.submitted
+
+
+def _update_rows(
+    connection: Connection,
+    names: Tuple[str, ...],
+    terminal: bool,
+    rows: List[Dict[str, Any]]
+) -> Set[int]:
+    """
+    Apply one group of transitions that set the same columns
+
+    Postgres gets a single UPDATE ... FROM (VALUES ...) for the whole
+    group; other dialects one UPDATE per row. Terminal transitions
+    stamp completed_at from the DB clock. Rows already cancelled are
+    left alone, so a run cancelled from another process cannot be
+    revived by its own late writes.
+
+    Returns:
+        Ids of the rows that were updated
+    """
+    table = WorkflowExecution.__table__
+    stamp = {"completed_at": func.now()} if terminal else {}
+
+    if connection.dialect.name == "postgresql":
+        data = values(
+            column("id", Integer),
+            *[column(name, table.c[name].type) for name in names],
+            name="v"
+        ).data([(row["id"], *[row[name] for name in names]) for row in rows])
+        return set(connection.execute(
+            update(table)
+            .where(table.c.id == data.c.id, table.c.status != "cancelled")
+            .values({**{name: data.c[name] for name in names}, **stamp})
+            .returning(table.c.id)
+        ).scalars())
+
+    # executemany reports one rowcount for all rows, so run them one by one to tell which applied
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("v_id"), table.c.status != "cancelled")
+        .values({**{name: bindparam(f"v_{name}") for name in names}, **stamp})
+    )
+    return {
+        row["id"] for row in rows
+        if connection.execute(statement, {f"v_{key}": value for key, value in row.items()}).rowcount
+    }
+
+
+def _apply(db: Session, transitions: List[Transition]):
+    """
+    Write a batch of transitions, with their agent tasks, search
+    documents and stats; those of transitions skipped because the row
+    was already cancelled are left out
+    """
+    connection = db.connection()
+    groups: Dict[Tuple[Tuple[str, ...], bool], List[Dict[str, Any]]] = {}
+
+    for transition in transitions:
+        row = offload_payloads(connection, transition.values)
+        names = tuple(sorted(row))
+        groups.setdefault((names, transition.terminal), []).append({"id": transition.execution_id, **row})
+
+    updated: Set[int] = set()
+    for (names, terminal), rows in groups.items():
+        updated |= _update_rows(connection, names, terminal, rows)
+    for transition in transitions:
+        transition.applied = transition.execution_id in updated
+    transitions = [transition for transition in transitions if transition.applied]
+
+    tasks = [task for transition in transitions for task in transition.agent_tasks]
+    if tasks:
+        connection.execute(AgentTask.__table__.insert().values(completed_at=func.now()), tasks)
+
+    documents = [
+        {"execution_id": transition.execution_id, "document": transition.document}
+        for transition in transitions if transition.document
+    ]
+    if documents:
+        upsert_documents(db, documents)
+
+    record_executions_stats(db, [
+        SimpleNamespace(**{
+            **dict.fromkeys(_STATS_COLUMNS),
+            **transition.values,
+            "workflow_id": transition.workflow_id,
+        })
+        for transition in transitions if transition.terminal and transition.workflow_id is not None
+    ])
+
+
+def write_transitions(transitions: List[Transition]) -> Dict[int, Exception]:
+    """
+    Commit a batch of transitions in one transaction
+
+    If the batch fails, each transition is retried in its own
+    transaction so one bad row cannot hold back the others. Blocking,
+    so call it from a worker thread.
+
+    Returns:
+        Errors of the transitions that could not be written, by execution id
+    """
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        try:
+            _apply(db, transitions)
+            db.commit()
+            STATUS_COMMITS.inc()
+            STATUS_COMMITS_SAVED.inc(sum(transition.submitted for transition in transitions) - 1)
+            for transition in transitions:
+                replica_router.mark_written("execution_id", transition.execution_id)
+            return {}
+        except Exception:
+            db.rollback()
+            if len(transitions) == 1:
+                raise
+
+        errors: Dict[int, Exception] = {}
+        for transition in transitions:
+            try:
+                _apply(db, [transition])
+                db.commit()
+                STATUS_COMMITS.inc()
+                replica_router.mark_written("execution_id", transition.execution_id)
+            except Exception as e:
+                db.rollback()
+                errors[transition.execution_id] = e
+        return errors
+
+    finally:
+        STATUS_FLUSH_DURATION.observe(time.perf_counter() - start)
+        db.close()
+
+
+class StatusWriter:
+    """
+    Batches execution state transitions from the event loop
+
+    Intermediate states (e.g. "running") are fire-and-forget: they are
+    written with the next flush and a later state of the same execution
+    replaces them if it arrives first. Terminal states are awaited by
+    the caller and only acknowledged once their transaction committed.
+    A flush happens STATUS_FLUSH_INTERVAL_MS after the first pending
+    transition, or immediately once STATUS_BATCH_SIZE are pending.
+    Every committed status is published as a "status" execution event.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, Transition] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Transitions and waiters of a previous event loop can no longer be served
+            self._pending = {}
+            self._loop = loop
+            self._task = None
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    def _enqueue(self, transition: Transition):
+        self._ensure_running()
+        pending = self._pending.get(transition.execution_id)
+        if pending is None:
+            self._pending[transition.execution_id] = transition
+        else:
+            pending.merge(transition)
+        self._wakeup.set()
+
+    def submit(self, execution_id: int, values: Dict[str, Any]):
+        """Queue an intermediate state without waiting for it to be written"""
+        STATUS_TRANSITIONS.labels("intermediate").inc()
+        self._enqueue(Transition(execution_id, values=dict(values)))
+
+    async def finish(
+        self,
+        execution_id: int,
+        workflow_id: int,
+        values: Dict[str, Any],
+        agent_tasks: Optional[List[Dict[str, Any]]] = None,
+        document: Optional[str] = None
+    ):
+        """
+        Queue a terminal state and wait until it is committed
+
+        The execution's agent tasks, its search document and its stats
+        rollup increments commit in the same transaction.
+
+        Raises:
+            Exception: The error that prevented the write
+        """
+        STATUS_TRANSITIONS.labels("terminal").inc()
+        await self._write(Transition(
+            execution_id,
+            workflow_id=workflow_id,
+            values=dict(values),
+            agent_tasks=list(agent_tasks or []),
+            document=document
+        ))
+
+    async def checkpoint(
+        self,
+        execution_id: int,
+        values: Dict[str, Any],
+        agent_tasks: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Queue an intermediate state that must not be lost (e.g. a run
+        handed back at shutdown) and wait until it is committed
+
+        Raises:
+            Exception: The error that prevented the write
+        """
+        STATUS_TRANSITIONS.labels("checkpoint").inc()
+        await self._write(Transition(execution_id, values=dict(values), agent_tasks=list(agent_tasks or [])))
+
+    async def _write(self, transition: Transition):
+        waiter = asyncio.get_running_loop().create_future()
+        transition.waiters.append(waiter)
+        self._enqueue(transition)
+        await waiter
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if not self._closing and len(self._pending) < settings.STATUS_BATCH_SIZE:
+                await asyncio.sleep(settings.STATUS_FLUSH_INTERVAL_MS / 1000)
+            await self._flush()
+            if self._closing and not self._pending:
+                return
+
+    async def _flush(self):
+        """Write up to STATUS_BATCH_SIZE pending transitions"""
+        ids = list(self._pending)[:settings.STATUS_BATCH_SIZE]
+        batch = [self._pending.pop(execution_id) for execution_id in ids]
+        if not self._pending:
+            self._wakeup.clear()
+        if not batch:
+            return
+
+        try:
+            errors = await asyncio.to_thread(write_transitions, batch)
+        except Exception as e:
+            errors = {transition.execution_id: e for transition in batch}
+
+        for transition in batch:
+            error = errors.get(transition.execution_id)
+            if error is not None and not transition.waiters:
+                print(f"⚠️ Status update of execution {transition.execution_id} failed: {error}")
+            if error is None and transition.applied and "status" in transition.values:
+                execution_events.publish(transition.execution_id, "status", status_event(transition.values))
+            for waiter in transition.waiters:
+                if waiter.done():
+                    continue
+                if error is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(error)
+
+    async def close(self):
+        """Write everything still pending and stop the flush task"""
+        if self._task is None or self._task.done():
+            return
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+            self._closing = False
+
+
+# Shared by all executions of the process
+status_writer = StatusWriter()
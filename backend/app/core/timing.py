@@ -0,0 +1,93 @@
+"""
+Execution Timing
+Monotonic, millisecond-resolution stage timings for workflow executions
+"""
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+from app.core.tracing import tracer
+
+
+class StageTimer:
+    """
+    Records how long each stage of a workflow execution takes
+
+    Uses the monotonic performance counter, so timings are not affected by
+    wall-clock adjustments or by differences between the app and DB clocks.
+    Repeated stages (e.g. several LLM calls) accumulate into one entry.
+    Each timed stage is also traced as an "execution.<stage>" span.
+    """
+
+    def __init__(self, enqueued_at: Optional[float] = None):
+        self.started_at = time.perf_counter()
+        self.enqueued_at = enqueued_at if enqueued_at is not None else self.started_at
+        self.stages: Dict[str, float] = {}
+
+        if enqueued_at is not None:
+            self.add("queued", (self.started_at - enqueued_at) * 1000)
+
+    def add(self, name: str, elapsed_ms: float):
+        """Add elapsed milliseconds to a stage"""
+        self.stages[name] = self.stages.get(name, 0.0) + max(elapsed_ms, 0.0)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time and trace the wrapped block as the given stage"""
+        start = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(f"execution.{name}"):
+                yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def total_ms(self) -> float:
+        """Milliseconds since the execution was enqueued"""
+        return (time.perf_counter() - self.enqueued_at) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Structured timings as stored on WorkflowExecution.timings
+
+        Returns:
+            Mapping of stage name to milliseconds, plus a "total" entry
+        """
+        timings = {name: round(ms, 3) for name, ms in self.stages.items()}
+        timings["total"] = round(self.total_ms(), 3)
+        return timings
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize_timings(timings: Iterable[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    Aggregate stored execution timings per stage
+
+    Args:
+        timings: Iterable of WorkflowExecution.timings dicts
+
+    Returns:
+        Per-stage count, average, p50, p95 and max in milliseconds
+    """
+    samples: Dict[str, List[float]] = {}
+    for entry in timings:
+        for name, ms in (entry or {}).items():
+            samples.setdefault(name, []).append(float(ms))
+
+    summary = {}
+    for name, values in samples.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "avg_ms": round(sum(values) / len(values), 3),
+            "p50_ms": round(_percentile(values, 50), 3),
+            "p95_ms": round(_percentile(values, 95), 3),
+            "max_ms": round(values[-1], 3),
+        }
+    return summary
@@ -0,0 +1,170 @@
+"""
+Distributed Tracing
+OpenTelemetry setup, pluggable span exporters and W3C trace context propagation
+"""
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from app.core.config import settings
+
+
+tracer = trace.get_tracer("flowmancer")
+
+
+def _console_exporter() -> SpanExporter:
+    return ConsoleSpanExporter()
+
+
+def _file_exporter() -> SpanExporter:
+    """One JSON span per line, appended to TRACING_FILE_PATH"""
+    out = open(settings.TRACING_FILE_PATH, "a", buffering=1)
+    return ConsoleSpanExporter(
+        out=out,
+        formatter=lambda span: span.to_json(indent=None) + os.linesep
+    )
+
+
+def _otlp_exporter() -> SpanExporter:
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError as e:
+        raise RuntimeError(
+            "TRACING_EXPORTER=otlp requires the opentelemetry-exporter-otlp package"
+        ) from e
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT or None)
+
+
+# Exporter factories by TRACING_EXPORTER name
+EXPORTERS: Dict[str, Callable[[], SpanExporter]] = {
+    "console": _console_exporter,
+    "file": _file_exporter,
+    "otlp": _otlp_exporter,
+}
+
+
+def register_exporter(name: str, factory: Callable[[], SpanExporter]):
+    """
+    Register an additional span exporter selectable via TRACING_EXPORTER
+    """
+    EXPORTERS[name] = factory
+
+
+def setup_tracing():
+    """
+    Install the global tracer provider with the configured exporter
+
+    With TRACING_EXPORTER=none spans are not recorded and the tracer
+    stays a no-op.
+    """
+    name = settings.TRACING_EXPORTER
+    if name == "none":
+        return
+    if name not in EXPORTERS:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {name}")
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME})
+    )
+    provider.add_span_processor(BatchSpanProcessor(EXPORTERS[name]()))
+    trace.set_tracer_provider(provider)
+
+
+def capture_context() -> Dict[str, str]:
+    """
+    Serialize the current trace context, e.g. to hand it to a background task
+    """
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+def extract_context(carrier: Optional[Dict[str, str]]) -> otel_context.Context:
+    """Rebuild a trace context captured with capture_context()"""
+    return propagate.extract(carrier or {})
+
+
+def inject_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Add trace context headers to an outbound request"""
+    propagate.inject(headers)
+    return headers
+
+
+def record_error(exc: BaseException, span: Any = None):
+    """Mark a span (the current one by default) as failed with the given exception"""
+    span = span or trace.get_current_span()
+    span.record_exception(exc)
+    span.set_status(Status(StatusCode.ERROR, str(exc)))
+
+
+def record_span(
+    name: str,
+    start_ns: int,
+    end_ns: Optional[int] = None,
+    parent: Any = None,
+    attributes: Optional[Dict[str, Any]] = None
+):
+    """
+    Record an already finished span with explicit start and end times
+
+    Used for work that is only observable after the fact, such as crew
+    tasks reported through callbacks.
+    """
+    ctx = trace.set_span_in_context(parent) if parent is not None else None
+    span = tracer.start_span(name, context=ctx, start_time=start_ns, attributes=attributes)
+    span.end(end_time=end_ns or time.time_ns())
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per request
+
+    Continues the caller's trace when the request carries a W3C
+    traceparent header (e.g. inbound n8n or Zapier webhooks).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.update_name(f"{scope['method']} {route.path}")
+                    span.set_attribute("http.route", route.path)
+                span.set_attribute("http.status_code", status_code)
+                if status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
@@ -0,0 +1,160 @@
+"""
+Workflow Definition Cache
+In-process cache of workflow definitions with TTL and write-through invalidation, optionally broadcast over Redis
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import WORKFLOW_CACHE_REQUESTS
+from app.models import Workflow
+
+
+INVALIDATION_CHANNEL = "flowmancer:workflow-invalidations"
+
+
+@dataclass(frozen=True)
+class WorkflowDefinition:
+    """Immutable snapshot of the workflow fields executions need"""
+    id: int
+    name: str
+    workflow_type: str
+    is_active: bool
+    config: Optional[Dict[str, Any]]
+    n8n_workflow_id: Optional[str]
+    zapier_webhook_url: Optional[str]
+
+    @classmethod
+    def from_model(cls, workflow: Workflow) -> "WorkflowDefinition":
+        return cls(
+            id=workflow.id,
+            name=workflow.name,
+            workflow_type=workflow.workflow_type,
+            is_active=bool(workflow.is_active),
+            config=workflow.config,
+            n8n_workflow_id=workflow.n8n_workflow_id,
+            zapier_webhook_url=workflow.zapier_webhook_url,
+        )
+
+
+class WorkflowCache:
+    """
+    Workflow definitions by id, kept for WORKFLOW_CACHE_TTL_SECONDS
+
+    Updates and deletes invalidate explicitly; the TTL only bounds how
+    stale an entry can get if an invalidation from another process is
+    missed. Each invalidation bumps a per-workflow generation, so a load
+    that raced with it is not cached.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, Tuple[float, WorkflowDefinition]] = {}
+        self._generations: Dict[int, int] = {}
+        self._publisher = None
+
+    def get(self, workflow_id: int, db: Optional[Session] = None) -> Optional[WorkflowDefinition]:
+        """
+        Cached definition of a workflow, loaded from the primary on a miss
+
+        Args:
+            workflow_id: Workflow to look up
+            db: Session to load with; a short-lived one is opened if omitted
+
+        Returns:
+            The definition, or None if the workflow does not exist (not cached)
+        """
+        cached = self._cached(workflow_id)
+        if cached is not None:
+            return cached
+
+        WORKFLOW_CACHE_REQUESTS.labels("miss").inc()
+        generation = self._generations.get(workflow_id, 0)
+        if db is None:
+            with SessionLocal() as session:
+                workflow = session.query(Workflow).filter(Workflow.id == workflow_id).first()
+                definition = WorkflowDefinition.from_model(workflow) if workflow else None
+        else:
+            workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
+            definition = WorkflowDefinition.from_model(workflow) if workflow else None
+
+        ttl = settings.WORKFLOW_CACHE_TTL_SECONDS
+        if definition is not None and ttl > 0 and self._generations.get(workflow_id, 0) == generation:
+            self._entries[workflow_id] = (time.monotonic() + ttl, definition)
+        return definition
+
+    async def get_async(self, workflow_id: int) -> Optional[WorkflowDefinition]:
+        """
+        get() for code on the event loop without a session: hits are
+        answered inline, misses load in a worker thread
+        """
+        cached = self._cached(workflow_id)
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.get, workflow_id)
+
+    def _cached(self, workflow_id: int) -> Optional[WorkflowDefinition]:
+        entry = self._entries.get(workflow_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        WORKFLOW_CACHE_REQUESTS.labels("hit").inc()
+        return entry[1]
+
+    def drop(self, workflow_id: Optional[int] = None):
+        """Forget one workflow (or all) in this process only"""
+        if workflow_id is None:
+            self._entries.clear()
+            for key in self._generations:
+                self._generations[key] += 1
+            return
+        self._entries.pop(workflow_id, None)
+        self._generations[workflow_id] = self._generations.get(workflow_id, 0) + 1
+
+    def invalidate(self, workflow_id: int):
+        """
+        Forget a workflow after it changed, here and, with
+        WORKFLOW_CACHE_REDIS, in every other process
+        """
+        self.drop(workflow_id)
+        if not settings.WORKFLOW_CACHE_REDIS:
+            return
+        try:
+            if self._publisher is None:
+                import redis
+                self._publisher = redis.Redis.from_url(settings.REDIS_URL)
+            self._publisher.publish(INVALIDATION_CHANNEL, str(workflow_id))
+        except Exception as e:
+            print(f"⚠️ Could not broadcast workflow {workflow_id} invalidation: {e}")
+
+
+async def invalidation_listener():
+    """
+    Apply invalidations broadcast by other processes until cancelled
+
+    Reconnects after Redis errors; the whole cache is dropped on each
+    (re)subscribe since invalidations may have been missed meanwhile.
+    """
+    import redis.asyncio as redis
+
+    while True:
+        client = redis.Redis.from_url(settings.REDIS_URL)
+        try:
+            pubsub = client.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            workflow_cache.drop()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    workflow_cache.drop(int(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Workflow invalidation listener failed, retrying: {e}")
+            await asyncio.sleep(5)
+        finally:
+            await client.aclose()
+
+
+# Shared by all requests and executions of the process
+workflow_cache = WorkflowCache()
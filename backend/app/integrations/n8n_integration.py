@@ -2,9 +2,12 @@
 n8n Integration Module
 Allows FlowMancer to trigger and interact with n8n workflows
 """
+import time
 import httpx
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.metrics import INTEGRATION_REQUEST_DURATION
+from app.core.tracing import SpanKind, inject_headers, record_error, tracer
 
 
 class N8nIntegration:
@@ -41,27 +44,40 @@ class N8nIntegration:
                 "message": "n8n integration not configured"
             }
         
-        try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.api_url}/workflows/{workflow_id}/execute"
-                response = await client.post(
-                    url,
-                    headers=self.headers,
-                    json={"data": data}
-                )
-                response.raise_for_status()
-                
+        start = time.perf_counter()
+        outcome = "error"
+        with tracer.start_as_current_span(
+            "n8n.trigger_workflow",
+            kind=SpanKind.CLIENT,
+            attributes={"n8n.workflow_id": workflow_id}
+        ) as span:
+            try:
+                async with httpx.AsyncClient() as client:
+                    url = f"{self.api_url}/workflows/{workflow_id}/execute"
+                    response = await client.post(
+                        url,
+                        headers=inject_headers(dict(self.headers)),
+                        json={"data": data}
+                    )
+                    response.raise_for_status()
+                    outcome = "success"
+                    
+                    return {
+                        "status": "success",
+                        "execution_id": response.json().get("executionId"),
+                        "data": response.json()
+                    }
+                    
+            except httpx.HTTPError as e:
+                record_error(e, span)
                 return {
-                    "status": "success",
-                    "execution_id": response.json().get("executionId"),
-                    "data": response.json()
+                    "status": "error",
+                    "message": f"Failed to trigger n8n workflow: {str(e)}"
                 }
-                
-        except httpx.HTTPError as e:
-            return {
-                "status": "error",
-                "message": f"Failed to trigger n8n workflow: {str(e)}"
-            }
+            finally:
+                INTEGRATION_REQUEST_DURATION.labels("n8n", outcome).observe(
+                    time.perf_counter() - start
+                )
     
     async def get_workflow_status(self, execution_id: str) -> Dict[str, Any]:
         """
@@ -2,9 +2,12 @@
 Zapier Integration Module
 Allows FlowMancer to send data to Zapier via webhooks
 """
+import time
 import httpx
 from typing import Dict, Any
 from app.core.config import settings
+from app.core.metrics import INTEGRATION_REQUEST_DURATION
+from app.core.tracing import SpanKind, inject_headers, record_error, tracer
 
 
 class ZapierIntegration:
@@ -38,26 +41,39 @@ class ZapierIntegration:
                 "message": "Zapier webhook URL not configured"
             }
         
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    json=data,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                
+        start = time.perf_counter()
+        outcome = "error"
+        with tracer.start_as_current_span(
+            "zapier.send_to_zapier",
+            kind=SpanKind.CLIENT
+        ) as span:
+            try:
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(
+                        url,
+                        json=data,
+                        headers=inject_headers({}),
+                        timeout=30.0
+                    )
+                    response.raise_for_status()
+                    outcome = "success"
+                    
+                    return {
+                        "status": "success",
+                        "message": "Data sent to Zapier successfully",
+                        "response": response.text
+                    }
+                    
+            except httpx.HTTPError as e:
+                record_error(e, span)
                 return {
-                    "status": "success",
-                    "message": "Data sent to Zapier successfully",
-                    "response": response.text
+                    "status": "error",
+                    "message": f"Failed to send to Zapier: {str(e)}"
                 }
-                
-        except httpx.HTTPError as e:
-            return {
-                "status": "error",
-                "message": f"Failed to send to Zapier: {str(e)}"
-            }
+            finally:
+                INTEGRATION_REQUEST_DURATION.labels("zapier", outcome).observe(
+                    time.perf_counter() - start
+                )
     
     def handle_webhook(self, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
         """
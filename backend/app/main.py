@@ -2,11 +2,32 @@
 FlowMancer - Main FastAPI Application
 AI-Powered Multi-Agent Workflow Orchestrator
 """
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.core.admission import admission_status, database_load_loop
 from app.core.config import settings
-from app.core.database import init_db
-from app.api import workflows, executions, webhooks, use_cases
+from app.core.database import SessionLocal, init_db, replica_health_loop, replica_router
+from app.core.deadlines import reaper_loop
+from app.core.events import execution_event_listener
+from app.core.payloads import register_payload_storage
+from app.core.search import register_search_index
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.retention import retention_loop
+from app.core.scheduler import execution_scheduler
+from app.core.status_writer import status_writer
+from app.core.tracing import TracingMiddleware, setup_tracing
+from app.core.workflow_cache import invalidation_listener
+from app.api import workflows, executions, webhooks, use_cases, admin, stats
+
+# Configure span export before any request is traced
+setup_tracing()
+
+# Index execution payloads for search, then offload large ones to compressed blobs
+register_search_index(SessionLocal)
+register_payload_storage(SessionLocal)
 
 # Create FastAPI app
 app = FastAPI(
@@ -27,6 +48,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record request latency per route
+app.add_middleware(MetricsMiddleware)
+
+# Trace each request, continuing inbound trace context
+app.add_middleware(TracingMiddleware)
+
+# Profile requests on demand (admin header) or by sampling
+app.add_middleware(ProfilingMiddleware)
+
 
 # Initialize database on startup
 @app.on_event("startup")
@@ -35,6 +65,23 @@ async def startup_event():
     Initialize application on startup
     """
     init_db()
+    if settings.RETENTION_INTERVAL_MINUTES > 0:
+        app.state.retention_task = asyncio.create_task(retention_loop())
+    if settings.EXECUTION_DISPATCH == "database":
+        # Claims pending executions, including ones handed back by other instances
+        app.state.claim_task = asyncio.create_task(executions.claim_loop())
+        # Executions waiting in the database count against the admission limit
+        app.state.database_load_task = asyncio.create_task(database_load_loop())
+    elif settings.EXECUTION_REQUEUE_POLL_SECONDS > 0:
+        app.state.requeue_task = asyncio.create_task(executions.requeue_loop())
+    if settings.EXECUTION_REAPER_INTERVAL_SECONDS > 0:
+        app.state.reaper_task = asyncio.create_task(reaper_loop())
+    if replica_router.replicas:
+        app.state.replica_health_task = asyncio.create_task(replica_health_loop())
+    if settings.WORKFLOW_CACHE_REDIS:
+        app.state.workflow_invalidation_task = asyncio.create_task(invalidation_listener())
+    if settings.EXECUTION_EVENTS_REDIS:
+        app.state.event_listener_task = asyncio.create_task(execution_event_listener())
     print(f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} started!")
     print(f"📚 API Documentation: http://{settings.HOST}:{settings.PORT}/api/docs")
 
@@ -43,7 +90,30 @@ async def startup_event():
 async def shutdown_event():
     """
     Cleanup on shutdown
+    
+    New executions are refused with 503 from here on. Running ones get
+    SHUTDOWN_GRACE_SECONDS to finish; the rest, and those still queued,
+    are checkpointed and requeued for another instance to resume.
     """
+    background_tasks = (
+        "retention_task",
+        "requeue_task",
+        "claim_task",
+        "database_load_task",
+        "reaper_task",
+        "replica_health_task",
+        "workflow_invalidation_task",
+        "event_listener_task",
+    )
+    for name in background_tasks:
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    queued = await execution_scheduler.drain(settings.SHUTDOWN_GRACE_SECONDS)
+    if queued:
+        await asyncio.to_thread(executions.requeue_executions, queued)
+    # Commit execution state transitions still waiting for a flush
+    await status_writer.close()
     print(f"👋 {settings.APP_NAME} shutting down...")
 
 
@@ -74,12 +144,31 @@ async def root():
 async def health_check():
     """
     Health check endpoint
+    
+    Reports the load, limit and shed count of each admission class and
+    the queued executions per priority. Lists read replicas with their
+    lag when any are configured; replicas that are unreachable or lag
+    too far behind are excluded from reads.
     """
-    return {
+    health = {
         "status": "healthy",
         "app": settings.APP_NAME,
-        "version": settings.APP_VERSION
+        "version": settings.APP_VERSION,
+        "admission": admission_status(),
+        "queues": execution_scheduler.depths()
     }
+    if replica_router.replicas:
+        health["replicas"] = replica_router.status()
+    return health
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus metrics in text exposition format
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 # Include API routers
@@ -87,6 +176,8 @@ app.include_router(workflows.router, prefix="/api")
 app.include_router(executions.router, prefix="/api")
 app.include_router(webhooks.router, prefix="/api")
 app.include_router(use_cases.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 
 # Error handlers
@@ -1,7 +1,7 @@
 """
 Models module initialization
 """
-from app.models.workflow import Workflow, WorkflowExecution, AgentTask
+from app.models.workflow import Workflow, WorkflowExecution, AgentTask, ExecutionBlob, ExecutionStats, ExecutionSearch
 
-__all__ = ["Workflow", "WorkflowExecution", "AgentTask"]
+__all__ = ["Workflow", "WorkflowExecution", "AgentTask", "ExecutionBlob", "ExecutionStats", "ExecutionSearch"]
 
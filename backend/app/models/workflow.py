@@ -1,11 +1,24 @@
 """
 Database models for workflows
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON, Float, Index, LargeBinary, DDL, event, literal_column, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 
+# JSONB on Postgres (indexable, containment operators), plain JSON elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+def version_column() -> Column:
+    """
+    Row version counter for ETags: bumped by every ORM or Core UPDATE
+    that doesn't set it explicitly
+    """
+    return Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
+
+
 class Workflow(Base):
     """
     Workflow model - represents an automation workflow
@@ -28,6 +41,7 @@ class Workflow(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = version_column()
     
     def __repr__(self):
         return f"<Workflow(id={self.id}, name='{self.name}', type='{self.workflow_type}')>"
@@ -38,23 +52,75 @@ class WorkflowExecution(Base):
     Workflow execution log - tracks each workflow run
     """
     __tablename__ = "workflow_executions"
+    __table_args__ = (
+        # Keyset pagination: per workflow, by status and globally, newest first
+        Index("ix_workflow_executions_workflow_started", "workflow_id", "started_at", "id"),
+        Index("ix_workflow_executions_status_started", "status", "started_at"),
+        # Reaper: running executions past their deadline
+        Index("ix_workflow_executions_status_deadline", "status", "deadline_at"),
+        # Executions handed back by a process that shut down, until another one picks them up
+        Index("ix_workflow_executions_requeued", "requeued_at"),
+        # Claiming pending executions per priority class, oldest first
+        Index("ix_workflow_executions_claim", "status", "priority", "id"),
+        Index("ix_workflow_executions_started", "started_at", "id"),
+        # Deduplication: Idempotency-Key per workflow (NULLs don't collide), recent identical inputs
+        Index("ux_workflow_executions_idempotency_key", "workflow_id", "idempotency_key", unique=True),
+        Index("ix_workflow_executions_input_hash", "workflow_id", "input_hash", "started_at"),
+        # JSON filters (Postgres only): equality via GIN containment, ranges via expression indexes
+        Index(
+            "ix_workflow_executions_input_data", "input_data",
+            postgresql_using="gin", postgresql_ops={"input_data": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_workflow_executions_output_data", "output_data",
+            postgresql_using="gin", postgresql_ops={"output_data": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_workflow_executions_lead_score", text("(output_data -> 'lead_score')")
+        ).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    workflow_id = Column(Integer, nullable=False, index=True)
+    workflow_id = Column(Integer, nullable=False)  # Indexed via ix_workflow_executions_workflow_started
     
     # Execution details
-    status = Column(String(50), default="pending")  # pending, running, completed, failed
-    input_data = Column(JSON, nullable=True)
-    output_data = Column(JSON, nullable=True)
+    status = Column(String(50), default="pending")  # pending, running, completed, failed, cancelled
+    priority = Column(String(20), nullable=True)  # Scheduler priority class: interactive, webhook, bulk
+    input_data = Column(JSONDocument, nullable=True)
+    output_data = Column(JSONDocument, nullable=True)
     error_message = Column(Text, nullable=True)
     
     # Agent execution details
     agent_logs = Column(JSON, nullable=True)  # Logs from each agent in the workflow
     
+    # Payloads above PAYLOAD_OFFLOAD_THRESHOLD live in execution_blobs; the JSON column then holds a stub
+    input_blob_digest = Column(String(64), nullable=True, index=True)
+    output_blob_digest = Column(String(64), nullable=True, index=True)
+    
+    # Deduplication of retried or double-submitted requests
+    idempotency_key = Column(String(255), nullable=True)
+    input_hash = Column(String(64), nullable=True)  # SHA-256 of the canonical JSON input
+    version = version_column()  # ETag of GET /executions/{id}; lease bookkeeping leaves it alone
+    
     # Timing
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
     duration_seconds = Column(Integer, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    timings = Column(JSON, nullable=True)  # Per-stage milliseconds: queued, llm, integration.*, persist, total
+    compacted_at = Column(DateTime(timezone=True), nullable=True)  # Payloads archived and dropped by retention
+    deadline_at = Column(DateTime(timezone=True), nullable=True)  # Set when running starts; the runner gives up by then
+    requeued_at = Column(DateTime(timezone=True), nullable=True)  # Handed back at shutdown, waiting to be resumed
+    claimed_by = Column(String(255), nullable=True)  # host:pid of the instance holding the lease (database dispatch)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # LLM usage rolled up from the execution's agent tasks
+    llm_calls = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    cost_usd = Column(Float, default=0.0)
     
     def __repr__(self):
         return f"<WorkflowExecution(id={self.id}, workflow_id={self.workflow_id}, status='{self.status}')>"
@@ -80,6 +146,14 @@ class AgentTask(Base):
     output_data = Column(JSON, nullable=True)
     reasoning = Column(Text, nullable=True)  # Agent's reasoning/thought process
     
+    # LLM usage
+    model = Column(String(100), nullable=True)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    latency_ms = Column(Integer, nullable=True)
+    cost_usd = Column(Float, default=0.0)
+    
     # Timestamps
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -87,3 +161,107 @@ class AgentTask(Base):
     def __repr__(self):
         return f"<AgentTask(id={self.id}, agent='{self.agent_name}', status='{self.status}')>"
 
+
+class ExecutionBlob(Base):
+    """
+    Compressed execution payload, content-addressed by the SHA-256 of its JSON
+    """
+    __tablename__ = "execution_blobs"
+    
+    digest = Column(String(64), primary_key=True)
+    codec = Column(String(16), nullable=False)  # zlib, zstd
+    size = Column(Integer, nullable=False)  # Uncompressed bytes
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped whenever a write reuses the blob, so garbage collection spares it while that write commits
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ExecutionBlob(digest='{self.digest[:12]}', codec='{self.codec}', size={self.size})>"
+
+
+class ExecutionStats(Base):
+    """
+    Execution rollup per workflow and hour, maintained as executions finish
+    
+    Latency is kept as a fixed histogram (latency_le_<ms> counts executions
+    above the previous bound and at or under this one) so percentiles can
+    be estimated without touching workflow_executions.
+    """
+    __tablename__ = "execution_stats"
+    
+    workflow_id = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True, index=True)  # Start of the hour, UTC
+    
+    # Counts by final status
+    executions = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    
+    # Latency
+    duration_ms_sum = Column(Integer, nullable=False, default=0)
+    latency_le_5 = Column(Integer, nullable=False, default=0)
+    latency_le_10 = Column(Integer, nullable=False, default=0)
+    latency_le_25 = Column(Integer, nullable=False, default=0)
+    latency_le_50 = Column(Integer, nullable=False, default=0)
+    latency_le_100 = Column(Integer, nullable=False, default=0)
+    latency_le_250 = Column(Integer, nullable=False, default=0)
+    latency_le_500 = Column(Integer, nullable=False, default=0)
+    latency_le_1000 = Column(Integer, nullable=False, default=0)
+    latency_le_2500 = Column(Integer, nullable=False, default=0)
+    latency_le_5000 = Column(Integer, nullable=False, default=0)
+    latency_le_10000 = Column(Integer, nullable=False, default=0)
+    latency_le_30000 = Column(Integer, nullable=False, default=0)
+    latency_le_60000 = Column(Integer, nullable=False, default=0)
+    latency_le_inf = Column(Integer, nullable=False, default=0)
+    
+    # LLM usage
+    llm_calls = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f"<ExecutionStats(workflow_id={self.workflow_id}, bucket_start='{self.bucket_start}', executions={self.executions})>"
+
+
+class ExecutionSearch(Base):
+    """
+    Searchable text of an execution (email subject and body, lead company
+    and message, extracted document fields), kept in sync on write
+    
+    Full-text indexing is dialect specific and created alongside the table:
+    a generated tsvector column with a GIN index on Postgres, an FTS5
+    external-content table kept in sync by triggers on SQLite.
+    """
+    __tablename__ = "execution_search"
+    
+    execution_id = Column(Integer, primary_key=True)
+    document = Column(Text, nullable=False)
+    
+    def __repr__(self):
+        return f"<ExecutionSearch(execution_id={self.execution_id})>"
+
+
+for statement in (
+    "ALTER TABLE execution_search ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', document)) STORED",
+    "CREATE INDEX ix_execution_search_vector ON execution_search USING gin (search_vector)",
+):
+    event.listen(ExecutionSearch.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+for statement in (
+    "CREATE VIRTUAL TABLE execution_search_fts USING fts5("
+    "document, content='execution_search', content_rowid='execution_id')",
+    "CREATE TRIGGER execution_search_ai AFTER INSERT ON execution_search BEGIN "
+    "INSERT INTO execution_search_fts(rowid, document) VALUES (new.execution_id, new.document); END",
+    "CREATE TRIGGER execution_search_ad AFTER DELETE ON execution_search BEGIN "
+    "INSERT INTO execution_search_fts(execution_search_fts, rowid, document) "
+    "VALUES ('delete', old.execution_id, old.document); END",
+    "CREATE TRIGGER execution_search_au AFTER UPDATE ON execution_search BEGIN "
+    "INSERT INTO execution_search_fts(execution_search_fts, rowid, document) "
+    "VALUES ('delete', old.execution_id, old.document); "
+    "INSERT INTO execution_search_fts(rowid, document) VALUES (new.execution_id, new.document); END",
+):
+    event.listen(ExecutionSearch.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -6,8 +6,17 @@ from app.schemas.workflow import (
     WorkflowUpdate,
     WorkflowResponse,
     WorkflowExecutionCreate,
+    WorkflowExecutionBulkResponse,
+    WorkflowExecutionSummary,
     WorkflowExecutionResponse,
+    ExecutionSearchHit,
+    StageTimingStats,
+    WorkflowTimingsResponse,
     AgentTaskResponse,
+    UsageBucket,
+    WorkflowUsageResponse,
+    StatsBucket,
+    ExecutionStatsResponse,
     WebhookPayload,
     LeadInput,
     LeadQualificationResult,
@@ -22,8 +31,17 @@ __all__ = [
     "WorkflowUpdate",
     "WorkflowResponse",
     "WorkflowExecutionCreate",
+    "WorkflowExecutionBulkResponse",
+    "WorkflowExecutionSummary",
     "WorkflowExecutionResponse",
+    "ExecutionSearchHit",
+    "StageTimingStats",
+    "WorkflowTimingsResponse",
     "AgentTaskResponse",
+    "UsageBucket",
+    "WorkflowUsageResponse",
+    "StatsBucket",
+    "ExecutionStatsResponse",
     "WebhookPayload",
     "LeadInput",
     "LeadQualificationResult",
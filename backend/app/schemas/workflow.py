@@ -1,8 +1,8 @@
 """
 Pydantic schemas for API request/response validation
 """
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+from typing import Optional, Dict, Any, List, Literal
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 
@@ -48,25 +48,67 @@ class WorkflowExecutionCreate(BaseModel):
     """Schema for creating a workflow execution"""
     workflow_id: int
     input_data: Dict[str, Any]
+    priority: Optional[Literal["interactive", "webhook", "bulk"]] = None
 
 
-class WorkflowExecutionResponse(BaseModel):
-    """Schema for workflow execution response"""
+class WorkflowExecutionBulkResponse(BaseModel):
+    """Schema for the executions created by one bulk request"""
+    workflow_id: int
+    count: int
+    first_id: Optional[int] = None
+    last_id: Optional[int] = None
+
+
+class WorkflowExecutionSummary(BaseModel):
+    """Schema for workflow execution without the input/output payloads"""
     id: int
     workflow_id: int
     status: str
-    input_data: Optional[Dict[str, Any]] = None
-    output_data: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
-    agent_logs: Optional[List[Dict[str, Any]]] = None
     started_at: datetime
     completed_at: Optional[datetime] = None
     duration_seconds: Optional[int] = None
+    duration_ms: Optional[int] = None
+    timings: Optional[Dict[str, float]] = None
+    llm_calls: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    cost_usd: Optional[float] = None
     
     class Config:
         from_attributes = True
 
 
+class WorkflowExecutionResponse(WorkflowExecutionSummary):
+    """Schema for workflow execution response"""
+    input_data: Optional[Dict[str, Any]] = None
+    output_data: Optional[Dict[str, Any]] = None
+    agent_logs: Optional[List[Dict[str, Any]]] = None
+
+
+class ExecutionSearchHit(WorkflowExecutionSummary):
+    """Execution matching a full-text search"""
+    rank: float
+    snippet: Optional[str] = None
+
+
+class StageTimingStats(BaseModel):
+    """Aggregated timing of one execution stage"""
+    count: int
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+class WorkflowTimingsResponse(BaseModel):
+    """Per-stage execution timings aggregated for a workflow"""
+    workflow_id: int
+    executions: int
+    stages: Dict[str, StageTimingStats]
+
+
 # Agent Task Schemas
 class AgentTaskResponse(BaseModel):
     """Schema for agent task response"""
@@ -79,6 +121,12 @@ class AgentTaskResponse(BaseModel):
     input_data: Optional[Dict[str, Any]] = None
     output_data: Optional[Dict[str, Any]] = None
     reasoning: Optional[str] = None
+    model: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    latency_ms: Optional[int] = None
+    cost_usd: Optional[float] = None
     started_at: datetime
     completed_at: Optional[datetime] = None
     
@@ -86,6 +134,55 @@ class AgentTaskResponse(BaseModel):
         from_attributes = True
 
 
+class UsageBucket(BaseModel):
+    """LLM usage of a workflow's executions on one day"""
+    day: date
+    executions: int
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost_usd: float
+
+
+class WorkflowUsageResponse(BaseModel):
+    """LLM token and cost totals for a workflow, per day"""
+    workflow_id: int
+    total_tokens: int
+    cost_usd: float
+    days: List[UsageBucket]
+
+
+class StatsBucket(BaseModel):
+    """Execution statistics of one hour"""
+    start: datetime
+    executions: int
+    completed: int
+    failed: int
+    avg_ms: Optional[float] = None
+    total_tokens: int
+    cost_usd: float
+
+
+class ExecutionStatsResponse(BaseModel):
+    """Execution counts, latency and LLM usage over a time window"""
+    workflow_id: Optional[int] = None
+    hours: int
+    executions: int
+    completed: int
+    failed: int
+    avg_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost_usd: float
+    buckets: List[StatsBucket]
+
+
 # Webhook Schemas
 class WebhookPayload(BaseModel):
     """Generic webhook payload"""
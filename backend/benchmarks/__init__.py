@@ -0,0 +1,4 @@
+"""
+Benchmarks package
+Standalone performance checks, run with `python -m benchmarks.<name>`
+"""
@@ -0,0 +1,98 @@
+"""
+Claim Throughput Benchmark
+Measures how fast concurrent workers claim pending executions with claim_executions
+(SELECT ... FOR UPDATE SKIP LOCKED) and checks that no execution is claimed twice
+
+Runs against DATABASE_URL, which should point at a scratch PostgreSQL database:
+the benchmark inserts its own workflow and executions and deletes them afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.claim_throughput [executions] [workers] [batch]
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List
+from sqlalchemy import delete, insert, update
+from app.core.database import SessionLocal, init_db
+from app.core.leases import claim_executions
+from app.core.scheduler import PRIORITIES
+from app.models import Workflow, WorkflowExecution
+
+
+def seed(executions: int) -> int:
+    """Insert a workflow with `executions` pending executions spread over the priority classes"""
+    with SessionLocal() as db:
+        workflow = Workflow(name="claim-throughput-benchmark", workflow_type="lead_qualification")
+        db.add(workflow)
+        db.flush()
+        for start in range(0, executions, 1000):
+            db.execute(insert(WorkflowExecution), [
+                {
+                    "workflow_id": workflow.id,
+                    "status": "pending",
+                    "priority": PRIORITIES[i % len(PRIORITIES)],
+                    "input_data": {"n": i},
+                }
+                for i in range(start, min(start + 1000, executions))
+            ])
+        db.commit()
+        return workflow.id
+
+
+def cleanup(workflow_id: int):
+    with SessionLocal() as db:
+        db.execute(delete(WorkflowExecution).where(WorkflowExecution.workflow_id == workflow_id))
+        db.execute(delete(Workflow).where(Workflow.id == workflow_id))
+        db.commit()
+
+
+def worker(batch: int, claimed: List[int]):
+    """Claim batches and complete them until nothing is left to claim"""
+    while True:
+        executions = claim_executions(batch)
+        if not executions:
+            return
+        execution_ids = [execution.id for execution in executions]
+        claimed.extend(execution_ids)
+        with SessionLocal() as db:
+            db.execute(
+                update(WorkflowExecution)
+                .where(WorkflowExecution.id.in_(execution_ids))
+                .values(status="completed")
+            )
+            db.commit()
+
+
+def main():
+    executions = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+
+    init_db()
+    workflow_id = seed(executions)
+    claims: List[List[int]] = [[] for _ in range(workers)]
+    threads = [threading.Thread(target=worker, args=(batch, claims[i])) for i in range(workers)]
+    try:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        cleanup(workflow_id)
+
+    counts = Counter(execution_id for claimed in claims for execution_id in claimed)
+    duplicates = sum(1 for count in counts.values() if count > 1)
+    print(f"executions:  {executions}")
+    print(f"workers:     {workers} (batch {batch})")
+    print(f"claimed:     {len(counts)} in {elapsed:.2f}s")
+    print(f"throughput:  {len(counts) / elapsed:10.0f} claims/s")
+    print(f"per worker:  {', '.join(str(len(claimed)) for claimed in claims)}")
+    print(f"duplicates:  {duplicates}")
+
+
+if __name__ == "__main__":
+    main()
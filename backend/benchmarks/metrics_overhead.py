@@ -0,0 +1,86 @@
+"""
+Metrics Overhead Benchmark
+Measures the per-request cost MetricsMiddleware adds to the hot path
+
+Usage:
+    python -m benchmarks.metrics_overhead [iterations]
+"""
+import asyncio
+import sys
+import time
+from fastapi import FastAPI
+from app.core.metrics import HTTP_REQUEST_DURATION, MetricsMiddleware
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    """Minimal app with one trivial route, optionally instrumented"""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def run_requests(app, iterations: int) -> float:
+    """Drive the ASGI app directly and return mean seconds per request"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i):
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/items/{i}",
+            "raw_path": f"/items/{i}".encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [],
+            "server": ("bench", 80),
+            "client": ("127.0.0.1", 1234),
+        }
+
+    # Warm up routing and lazy middleware stack construction
+    for i in range(200):
+        await app(scope(i), receive, send)
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        await app(scope(i), receive, send)
+    return (time.perf_counter() - start) / iterations
+
+
+def bench_observe(iterations: int) -> float:
+    """Mean seconds per labelled histogram observation"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        HTTP_REQUEST_DURATION.labels("GET", "/bench", "200").observe(0.01)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    baseline = asyncio.run(run_requests(build_app(False), iterations))
+    instrumented = asyncio.run(run_requests(build_app(True), iterations))
+    observe = bench_observe(iterations)
+
+    overhead = instrumented - baseline
+    print(f"requests:            {iterations}")
+    print(f"baseline:            {baseline * 1e6:8.2f} us/request")
+    print(f"with metrics:        {instrumented * 1e6:8.2f} us/request")
+    print(f"middleware overhead: {overhead * 1e6:8.2f} us/request ({overhead / baseline:.1%})")
+    print(f"histogram observe:   {observe * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Test configuration: required settings and a scratch SQLite database, set
+before any app module is imported
+"""
+import os
+import tempfile
+
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'flowmancer.db')}")
@@ -0,0 +1,48 @@
+"""
+Filters on execution payload fields
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.core.json_filters import json_condition, parse_condition
+from app.models import WorkflowExecution
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'filters.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add_all([
+            WorkflowExecution(id=1, workflow_id=1, output_data={"lead_score": None}),
+            WorkflowExecution(id=2, workflow_id=1, output_data={"lead_score": 85, "category": "hot"}),
+            WorkflowExecution(id=3, workflow_id=1, output_data={"lead_score": 40}),
+            WorkflowExecution(id=4, workflow_id=1, output_data={}),
+        ])
+        session.commit()
+        yield session
+
+
+def matching(db: Session, condition: str):
+    clause = json_condition("sqlite", condition)
+    return db.execute(select(WorkflowExecution.id).where(clause).order_by(WorkflowExecution.id)).scalars().all()
+
+
+def test_compares_numbers_and_strings(db):
+    assert matching(db, "output_data.lead_score>=80") == [2]
+    assert matching(db, "output_data.category=hot") == [2]
+
+
+def test_null_matches_explicit_json_null(db):
+    assert matching(db, "output_data.lead_score=null") == [1]
+
+
+def test_not_null_matches_other_values(db):
+    assert matching(db, "output_data.lead_score!=null") == [2, 3]
+
+
+def test_null_rejects_ranges():
+    with pytest.raises(HTTPException):
+        parse_condition("output_data.lead_score>null")
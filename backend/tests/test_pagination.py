@@ -0,0 +1,44 @@
+"""
+Keyset pagination of executions
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.core.pagination import keyset_page
+from app.models import WorkflowExecution
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add_all([WorkflowExecution(id=i, workflow_id=1, status="completed") for i in range(1, 6)])
+        session.commit()
+        yield session
+
+
+def test_pages_cover_every_row_once(db):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(db.query(WorkflowExecution), cursor, 2)
+        ids += [row.id for row in rows]
+        if cursor is None:
+            break
+    assert ids == [5, 4, 3, 2, 1]
+
+
+def test_last_page_after_valid_cursor_is_empty(db):
+    rows, cursor = keyset_page(db.query(WorkflowExecution), 1, 2)
+    assert rows == [] and cursor is None
+
+
+def test_unknown_cursor_is_rejected(db):
+    _, cursor = keyset_page(db.query(WorkflowExecution), None, 2)
+    db.delete(db.get(WorkflowExecution, cursor))
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        keyset_page(db.query(WorkflowExecution), cursor, 2)
+    assert error.value.status_code == 400
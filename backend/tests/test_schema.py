@@ -0,0 +1,100 @@
+"""
+Schema upgrades of databases created before columns were added to existing tables
+"""
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.core.schema import upgrade_schema
+from app.models import AgentTask, Workflow, WorkflowExecution
+
+# Tables as created by the first release
+BASELINE_SCHEMA = (
+    """CREATE TABLE workflows (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        description TEXT,
+        workflow_type VARCHAR(50) NOT NULL,
+        config JSON,
+        is_active BOOLEAN,
+        n8n_workflow_id VARCHAR(255),
+        zapier_webhook_url VARCHAR(500),
+        created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+        updated_at DATETIME
+    )""",
+    """CREATE TABLE workflow_executions (
+        id INTEGER NOT NULL PRIMARY KEY,
+        workflow_id INTEGER NOT NULL,
+        status VARCHAR(50),
+        input_data JSON,
+        output_data JSON,
+        error_message TEXT,
+        agent_logs JSON,
+        started_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+        completed_at DATETIME,
+        duration_seconds INTEGER
+    )""",
+    """CREATE TABLE agent_tasks (
+        id INTEGER NOT NULL PRIMARY KEY,
+        execution_id INTEGER NOT NULL,
+        agent_name VARCHAR(255) NOT NULL,
+        agent_role VARCHAR(255) NOT NULL,
+        task_description TEXT NOT NULL,
+        status VARCHAR(50),
+        input_data JSON,
+        output_data JSON,
+        reasoning TEXT,
+        started_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+        completed_at DATETIME
+    )""",
+    "CREATE INDEX ix_workflow_executions_workflow_id ON workflow_executions (workflow_id)",
+    "INSERT INTO workflows (id, name, workflow_type, is_active) VALUES (1, 'Leads', 'lead_qualification', 1)",
+    "INSERT INTO workflow_executions (id, workflow_id, status, input_data) VALUES (1, 1, 'completed', '{\"name\": \"Jo\"}')",
+    "INSERT INTO agent_tasks (id, execution_id, agent_name, agent_role, task_description, status) "
+    "VALUES (1, 1, 'scorer', 'Lead Scorer', 'Score the lead', 'completed')",
+)
+
+
+def baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+    return engine
+
+
+def test_upgrade_adds_missing_columns_and_indexes(tmp_path):
+    engine = baseline_engine(tmp_path)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        executed = upgrade_schema(connection, Base.metadata)
+
+    assert executed
+    inspector = inspect(engine)
+    for table in (Workflow.__table__, WorkflowExecution.__table__, AgentTask.__table__):
+        assert {column.name for column in table.columns} <= {
+            column["name"] for column in inspector.get_columns(table.name)
+        }
+    indexes = {index["name"] for index in inspector.get_indexes("workflow_executions")}
+    assert {"ix_workflow_executions_claim", "ux_workflow_executions_idempotency_key"} <= indexes
+
+    with Session(engine) as db:
+        execution = db.execute(select(WorkflowExecution)).scalar_one()
+        assert execution.input_data == {"name": "Jo"}
+        assert execution.version == 1
+        assert execution.total_tokens == 0
+        assert db.execute(select(Workflow.version)).scalar_one() == 1
+        assert db.execute(select(AgentTask.cost_usd)).scalar_one() == 0.0
+
+        execution.status = "failed"
+        db.commit()
+        assert execution.version == 2
+
+
+def test_upgrade_is_idempotent(tmp_path):
+    engine = baseline_engine(tmp_path)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection, Base.metadata)
+    with engine.begin() as connection:
+        assert upgrade_schema(connection, Base.metadata) == []
+        assert connection.execute(text("SELECT count(*) FROM workflow_executions")).scalar() == 1
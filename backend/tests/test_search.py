@@ -0,0 +1,30 @@
+"""
+Full-text search of execution documents
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.core.search import search_executions
+from app.models import ExecutionSearch, WorkflowExecution
+
+
+def make_session(tmp_path) -> Session:
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = Session(engine)
+    db.add(WorkflowExecution(id=1, workflow_id=1, status="completed"))
+    db.add(ExecutionSearch(execution_id=1, document="Invoice 42 overdue, please pay"))
+    db.commit()
+    return db
+
+
+def test_search_finds_terms(tmp_path):
+    with make_session(tmp_path) as db:
+        hits = search_executions(db, "invoice overdue", None, 20, 0)
+        assert [execution_id for execution_id, _, _ in hits] == [1]
+
+
+def test_whitespace_query_returns_no_hits(tmp_path):
+    with make_session(tmp_path) as db:
+        assert search_executions(db, " ", None, 20, 0) == []
+        assert search_executions(db, "\t\n", None, 20, 0) == []
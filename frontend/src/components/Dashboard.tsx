@@ -2,8 +2,8 @@
 
 import { useEffect, useState } from 'react';
 import { Activity, Zap, TrendingUp, Clock } from 'lucide-react';
-import { workflowsApi } from '@/lib/api';
-import type { Workflow } from '@/types';
+import { statsApi, workflowsApi } from '@/lib/api';
+import type { ExecutionStats, Workflow } from '@/types';
 
 interface StatCardProps {
   title: string;
@@ -36,10 +36,12 @@ function StatCard({ title, value, icon, trend, color }: StatCardProps) {
 
 export default function Dashboard() {
   const [workflows, setWorkflows] = useState<Workflow[]>([]);
+  const [executionStats, setExecutionStats] = useState<ExecutionStats | null>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     loadWorkflows();
+    loadStats();
   }, []);
 
   const loadWorkflows = async () => {
@@ -53,11 +55,24 @@ export default function Dashboard() {
     }
   };
 
+  const loadStats = async () => {
+    try {
+      const response = await statsApi.get(24 * 7);
+      setExecutionStats(response.data);
+    } catch (error) {
+      console.error('Failed to load stats:', error);
+    }
+  };
+
+  const formatDuration = (ms?: number) =>
+    ms == null ? '-' : ms < 1000 ? `${Math.round(ms)}ms` : `${(ms / 1000).toFixed(1)}s`;
+
   const stats = {
     totalWorkflows: workflows.length,
     activeWorkflows: workflows.filter(w => w.is_active).length,
-    totalExecutions: 245, // Mock data
-    avgResponseTime: '2.3s', // Mock data
+    totalExecutions: executionStats?.executions ?? '-',
+    avgResponseTime: formatDuration(executionStats?.avg_ms),
+    p95ResponseTime: formatDuration(executionStats?.p95_ms),
   };
 
   return (
@@ -84,16 +99,16 @@ export default function Dashboard() {
           color="#10b981"
         />
         <StatCard
-          title="Total Executions"
+          title="Executions (7 days)"
           value={stats.totalExecutions}
           icon={<TrendingUp />}
-          trend="+25% this week"
           color="#8b5cf6"
         />
         <StatCard
           title="Avg Response Time"
           value={stats.avgResponseTime}
           icon={<Clock />}
+          trend={executionStats?.p95_ms != null ? `p95 ${stats.p95ResponseTime}` : undefined}
           color="#f59e0b"
         />
       </div>
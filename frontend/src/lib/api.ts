@@ -2,7 +2,7 @@
  * API Client for FlowMancer Backend
  */
 import axios from 'axios';
-import type { Workflow, WorkflowExecution, LeadInput, EmailInput, DocumentInput } from '@/types';
+import type { Workflow, WorkflowExecution, ExecutionStats, LeadInput, EmailInput, DocumentInput } from '@/types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -41,6 +41,14 @@ export const executionsApi = {
   get: (id: number) => api.get<WorkflowExecution>(`/api/executions/${id}`),
 };
 
+// Stats API
+export const statsApi = {
+  get: (hours = 24, workflowId?: number) =>
+    api.get<ExecutionStats>('/api/stats/', {
+      params: { hours, workflow_id: workflowId },
+    }),
+};
+
 // Use Cases API
 export const useCasesApi = {
   qualifyLead: (data: LeadInput) => 
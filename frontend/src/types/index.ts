@@ -26,6 +26,35 @@ export interface WorkflowExecution {
   started_at: string;
   completed_at?: string;
   duration_seconds?: number;
+  duration_ms?: number;
+}
+
+export interface StatsBucket {
+  start: string;
+  executions: number;
+  completed: number;
+  failed: number;
+  avg_ms?: number;
+  total_tokens: number;
+  cost_usd: number;
+}
+
+export interface ExecutionStats {
+  workflow_id?: number;
+  hours: number;
+  executions: number;
+  completed: number;
+  failed: number;
+  avg_ms?: number;
+  p50_ms?: number;
+  p95_ms?: number;
+  p99_ms?: number;
+  llm_calls: number;
+  prompt_tokens: number;
+  completion_tokens: number;
+  total_tokens: number;
+  cost_usd: number;
+  buckets: StatsBucket[];
 }
 
 export interface LeadInput {